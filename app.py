@@ -1,18 +1,34 @@
+import os
 import re
 import streamlit as st
 import pandas as pd
-import io
-from services.parser import parse_resume, parse_jd
-from services.scorer import score_candidate, embed
-from services.interview import generate_questions
-from services.llm import generate_text
+from services.parser import parse_jd
+from services.pipeline import parse_files, screening_fingerprint
+from services.ranking import ScreeningResults, component_matrix
+from services.bias import redacted_matrix, audit_frame
+from services.multi_jd import screen_many
+from services.dedup import NearDuplicateIndex
+from services.scorer import score_candidates, embed
+from services.vector_index import get_candidate_index
+from services.skills import skill_matcher
+from services.interview import stream_questions, prefetch_questions
+from services.prefetch import Prefetcher
+from services.report import (
+    candidate_pdf, full_report_pdf, candidate_key, full_report_key, fragment_cache
+)
+from services.llm import generate_text_stream
+from services.warmup import start_background_warmup
 from utils.text import extract_text
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+from utils.cache import content_hash
+from utils.instrument import Metrics, activate, profiled, PROFILE_MODE
 
 st.set_page_config(page_title="Resume Screener", layout="wide")
 
+# Models load lazily on first use; warming them in a background thread lets
+# the first screening skip that cost without delaying the first render.
+if os.getenv("MODEL_WARMUP", "1") == "1":
+    start_background_warmup()
+
 if "active_tab" not in st.session_state:
     st.session_state.active_tab = "Job Description"
 if "user_jd" not in st.session_state:
@@ -27,48 +43,88 @@ if "jd_emb" not in st.session_state:
     st.session_state.jd_emb = None
 if "results" not in st.session_state:
     st.session_state.results = None
+if "results_fingerprint" not in st.session_state:
+    st.session_state.results_fingerprint = None
 if "questions" not in st.session_state:
     st.session_state.questions = {}
+if "metrics" not in st.session_state:
+    st.session_state.metrics = Metrics("session")
+activate(st.session_state.metrics)
+if "question_prefetcher" not in st.session_state:
+    st.session_state.question_prefetcher = Prefetcher(prefetch_questions, run=st.session_state.metrics)
+if "report_worker" not in st.session_state:
+    st.session_state.report_worker = Prefetcher(full_report_pdf, workers=1, run=st.session_state.metrics)
+if "bias_audit" not in st.session_state:
+    st.session_state.bias_audit = None
+if "multi_jd" not in st.session_state:
+    st.session_state.multi_jd = None
+if "duplicates" not in st.session_state:
+    # Upload hash -> (representative result key, file name).
+    st.session_state.duplicates = {}
+if "dedup_index" not in st.session_state:
+    st.session_state.dedup_index = NearDuplicateIndex()
 if "notes" not in st.session_state:
     st.session_state.notes = {}
 if "jd_confirmed_banner" not in st.session_state:
     st.session_state.jd_confirmed_banner = False
 
 
+def reset_questions():
+    # Questions depend on the JD; jobs already queued for the old one are
+    # left to finish on the abandoned pool and their results ignored.
+    st.session_state.questions = {}
+    st.session_state.question_prefetcher = Prefetcher(prefetch_questions, run=st.session_state.metrics)
+
+
+def collect_questions(candidates):
+    prefetcher = st.session_state.question_prefetcher
+    for candidate in candidates:
+        if candidate not in st.session_state.questions:
+            result = prefetcher.result(candidate)
+            if result is not None and result[0]:
+                st.session_state.questions[candidate] = result[0]
+
+
+def scoring_sidebar():
+    st.sidebar.header("Scoring Weights")
+
+    weights = {
+        "Skills":     st.sidebar.slider("Skills",     0.0, 1.0, 0.3),
+        "Experience": st.sidebar.slider("Experience", 0.0, 1.0, 0.2),
+        "Semantic":   st.sidebar.slider("Semantic",   0.0, 1.0, 0.3),
+        "Skill Gap":  st.sidebar.slider("Skill Gap",  0.0, 1.0, 0.2),
+    }
+
+    top_n = st.sidebar.number_input("Top N Candidates", 1, 50, 5)
+    return weights, top_n
+
+
 def safe_key(prefix, value):
     return f"{prefix}_{re.sub(r'[^a-zA-Z0-9]', '_', str(value))}"
 
 
-def build_candidate_elements(candidate, score, resume, questions, notes, styles):
-    recruiter_note = notes.get(candidate, "") or "None"
-    skill_text = ", ".join(resume["skills"]) if resume["skills"] else "None detected"
-    elements = [
-        Paragraph(f"Candidate: {candidate}", styles["Heading2"]),
-        Spacer(1, 0.2 * inch),
-        Paragraph(f"Score: {round(score, 3)}", styles["Normal"]),
-        Spacer(1, 0.1 * inch),
-        Paragraph(f"Skills: {skill_text}", styles["Normal"]),
-        Paragraph(f"Experience: {resume['years_experience']} years", styles["Normal"]),
-        Spacer(1, 0.2 * inch),
-        Paragraph("Resume Summary:", styles["Heading3"]),
-        Paragraph(resume["summary"], styles["Normal"]),
-        Spacer(1, 0.2 * inch),
-        Paragraph("Interview Questions:", styles["Heading3"]),
-        Paragraph(questions, styles["Normal"]),
-        Spacer(1, 0.2 * inch),
-        Paragraph("Recruiter Notes:", styles["Heading3"]),
-        Paragraph(recruiter_note, styles["Normal"]),
-        Spacer(1, 0.5 * inch),
-    ]
-    return elements
+def stream_text(label, prompt, cache=True):
+    # Render a completion token by token, then collapse it to a latency note;
+    # the full text is returned for the caller to store.
+    stream = generate_text_stream(prompt, cache=cache)
+    placeholder = st.empty()
+    with placeholder.container():
+        st.caption(f"{label}...")
+        st.write_stream(stream)
+    placeholder.empty()
+    if stream.latency:
+        st.caption(f"{label}: first token {stream.ttft}s, total {stream.latency}s")
+    return stream.text
 
 
 st.title("Resume Screener")
 
+TABS = ["Job Description", "Resume Screening", "Multi-JD Matrix"]
+
 tab_choice = st.radio(
     "",
-    ["Job Description", "Resume Screening"],
-    index=0 if st.session_state.active_tab == "Job Description" else 1,
+    TABS,
+    index=TABS.index(st.session_state.active_tab),
     horizontal=True
 )
 
@@ -84,8 +140,7 @@ if tab_choice == "Job Description":
             jd_text = extract_text(jd_file) if jd_file else jd_text_input
             if jd_text.strip():
                 st.session_state.user_jd = jd_text
-                with st.spinner("Generating improved JD..."):
-                    improved, _ = generate_text(f"Improve this JD:\n\n{jd_text}")
+                improved = stream_text("Generating improved JD", f"Improve this JD:\n\n{jd_text}")
                 st.session_state.ai_jd = improved
                 st.success("JD loaded and improved.")
             else:
@@ -100,15 +155,15 @@ if tab_choice == "Job Description":
 
         if st.button("Generate JD"):
             if title.strip():
-                with st.spinner("Generating JD..."):
-                    jd_text, _ = generate_text(
-                        f"Generate a professional job description.\n\n"
-                        f"Title: {title}\nDepartment: {department}\n"
-                        f"Seniority: {seniority}\nRequirements: {key_req}"
-                    )
+                jd_text = stream_text(
+                    "Generating JD",
+                    f"Generate a professional job description.\n\n"
+                    f"Title: {title}\nDepartment: {department}\n"
+                    f"Seniority: {seniority}\nRequirements: {key_req}",
+                    cache=False
+                )
                 st.session_state.user_jd = jd_text
-                with st.spinner("Improving JD..."):
-                    improved, _ = generate_text(f"Improve this JD:\n\n{jd_text}")
+                improved = stream_text("Improving JD", f"Improve this JD:\n\n{jd_text}")
                 st.session_state.ai_jd = improved
                 st.success("JD generated and improved.")
             else:
@@ -139,6 +194,11 @@ if tab_choice == "Job Description":
                 st.session_state.jd_struct = parse_jd(selected)
                 st.session_state.jd_emb = embed(st.session_state.jd_struct["summary"])
 
+            if st.session_state.results_fingerprint != screening_fingerprint(selected):
+                st.session_state.results = None
+                st.session_state.results_fingerprint = None
+                reset_questions()
+
             st.session_state.jd_confirmed_banner = True
             st.session_state.active_tab = "Resume Screening"
             st.rerun()
@@ -153,16 +213,41 @@ if tab_choice == "Resume Screening":
         st.success("Job Description confirmed. Ready for resume screening.")
         st.session_state.jd_confirmed_banner = False
 
-    st.sidebar.header("Scoring Weights")
+    weights, top_n = scoring_sidebar()
 
-    weights = {
-        "Skills":     st.sidebar.slider("Skills",     0.0, 1.0, 0.3),
-        "Experience": st.sidebar.slider("Experience", 0.0, 1.0, 0.2),
-        "Semantic":   st.sidebar.slider("Semantic",   0.0, 1.0, 0.3),
-        "Skill Gap":  st.sidebar.slider("Skill Gap",  0.0, 1.0, 0.2),
-    }
+    st.sidebar.header("Diagnostics")
+    profile_modes = ["off", "cprofile", "pyinstrument"]
+    profile_mode = st.sidebar.selectbox(
+        "Profile screening runs",
+        profile_modes,
+        index=profile_modes.index(PROFILE_MODE) if PROFILE_MODE in profile_modes else 0
+    )
 
-    top_n = st.sidebar.number_input("Top N Candidates", 1, 50, 5)
+    candidate_index = get_candidate_index()
+    with st.expander(f"Search Past Candidates ({len(candidate_index)} indexed)"):
+        search_k = st.number_input("Results", 1, 200, 20)
+        search_skills = st.multiselect(
+            "Required Skills",
+            skill_matcher.skills,
+            default=[s for s in st.session_state.jd_struct["skills"] if s in skill_matcher.taxonomy]
+        )
+        search_years = st.number_input("Minimum Years Experience", 0, 50, 0)
+        if st.button("Search Index"):
+            hits = candidate_index.search(
+                st.session_state.jd_emb,
+                k=int(search_k),
+                required_skills=search_skills,
+                min_years=search_years or None
+            )
+            if hits:
+                st.dataframe(pd.DataFrame([{
+                    "Candidate":        hit["name"],
+                    "Similarity":       round(hit["score"], 3),
+                    "Years Experience": hit["years_experience"],
+                    "Skills":           ", ".join(hit["skills"]),
+                } for hit in hits]), use_container_width=True, hide_index=True)
+            else:
+                st.info("No indexed candidates match these filters.")
 
     files = st.file_uploader(
         "Upload Resumes",
@@ -175,46 +260,104 @@ if tab_choice == "Resume Screening":
             st.error("Upload at least one resume.")
             st.stop()
 
-        results = []
-        progress = st.progress(0, text="Parsing resumes...")
+        st.session_state.metrics.start_run("screening")
+        with profiled(profile_mode):
+            # Incremental run: results are keyed by upload content hash, so only
+            # files not screened under the current JD (and parser/scorer config)
+            # are processed; results for files no longer uploaded are dropped.
+            fingerprint = screening_fingerprint(st.session_state.selected_jd)
+            previous = st.session_state.results
+            if st.session_state.results_fingerprint != fingerprint:
+                previous = None
+                reset_questions()
+            known = previous.positions() if previous else {}
+
+            upload_hashes = {}
+            for file in files:
+                upload_hashes.setdefault(content_hash(file.getvalue()), file)
+            kept = previous.subset([known[h] for h in upload_hashes if h in known]) if previous else None
+            # Uploads already linked to a kept result are neither extracted
+            # nor matched again.
+            kept_keys = set(kept.keys) if kept else set()
+            links = {
+                h: link for h, link in st.session_state.duplicates.items()
+                if h in upload_hashes and link[0] in kept_keys
+            }
+            new_files = [file for h, file in upload_hashes.items() if h not in known and h not in links]
+
+            # Near-duplicates (the same resume as PDF and DOCX, trivial edits)
+            # are matched against kept results too, and are linked to their
+            # representative instead of being parsed and scored again. The
+            # index persists across runs, so kept resumes are not re-hashed;
+            # only entries for dropped results are removed, and kept results
+            # missing from it (restored from elsewhere) are added.
+            dedup_index = st.session_state.dedup_index
+            dedup_index.retain(kept.keys if kept else [])
+            for key, resume in zip(kept.keys if kept else [], kept.resumes if kept else []):
+                if key not in dedup_index:
+                    dedup_index.add(key, resume.get("text") or resume["summary"])
+
+            fresh = None
+            if new_files:
+                progress = st.progress(0, text=f"Extracting and parsing {len(new_files)} new resumes...")
+                file_hashes, structs, errors, duplicate_of = parse_files(
+                    [(file.name, file.getvalue()) for file in new_files], dedup_index
+                )
+                for file, error in zip(new_files, errors):
+                    if error:
+                        st.warning(f"Skipped {file.name}: {error}")
+                for file, file_hash, link in zip(new_files, file_hashes, duplicate_of):
+                    if link is not None:
+                        links[file_hash] = (link, file.name)
+                if any(link is not None for link in duplicate_of):
+                    merged = sum(link is not None for link in duplicate_of)
+                    st.info(f"Merged {merged} near-duplicate uploads into their original resumes.")
+
+                parsed = [i for i, struct in enumerate(structs) if struct is not None]
+                resume_structs = [structs[i] for i in parsed]
+
+                progress.progress(1.0, text="Scoring resumes...")
+                scored = score_candidates(
+                    st.session_state.jd_struct,
+                    resume_structs,
+                    st.session_state.jd_emb,
+                    weights
+                )
 
-        for i, file in enumerate(files):
-            progress.progress((i + 1) / len(files), text=f"Processing {file.name}...")
-            raw = extract_text(file)
-            resume_struct = parse_resume(raw, file.name)
-            total_score, breakdown, _ = score_candidate(
-                st.session_state.jd_struct,
-                resume_struct,
-                st.session_state.jd_emb,
-                weights
-            )
-            results.append({
-                "Candidate": resume_struct["name"] or file.name,
-                "Score":     total_score,
-                "Breakdown": breakdown,
-                "Resume":    resume_struct
-            })
+                if scored:
+                    candidate_index.add(
+                        [file_hashes[i] for i in parsed],
+                        [embedding for _, _, embedding in scored],
+                        resume_structs
+                    )
+                    candidate_index.save()
+
+                progress.empty()
+                fresh = ScreeningResults(
+                    [file_hashes[i] for i in parsed],
+                    [structs[i]["name"] or new_files[i].name for i in parsed],
+                    resume_structs,
+                    component_matrix([breakdown for _, breakdown, _ in scored])
+                )
 
-        progress.empty()
-        st.session_state.results = results
-        st.session_state.questions = {}
+            reused = len(kept) if kept else 0
+            st.session_state.results = ScreeningResults.concat([kept, fresh])
+            st.session_state.duplicates = links
+            st.session_state.results_fingerprint = fingerprint
+            if reused:
+                st.info(f"Reused {reused} previously screened resumes; processed {len(new_files)} new.")
 
     if st.session_state.results:
 
-        df = pd.DataFrame(st.session_state.results)
-
-        df["Score"] = df.apply(
-            lambda row:
-            weights["Skills"]     * row["Breakdown"]["skill_score"] +
-            weights["Experience"] * row["Breakdown"]["experience_score"] +
-            weights["Semantic"]   * row["Breakdown"]["semantic_score"] +
-            weights["Skill Gap"]  * row["Breakdown"]["gap_score"],
-            axis=1
-        )
-
-        df = df.sort_values("Score", ascending=False)
-        df = df[df["Candidate"].notna()]
-        df_top = df.head(int(top_n))
+        results = st.session_state.results
+        order, scores = results.rank(weights, int(top_n))
+        df_top = pd.DataFrame({
+            "Candidate": [results.candidates[i] for i in order],
+            "Score":     scores,
+            "Breakdown": [results.breakdown(i) for i in order],
+            "Resume":    [results.resumes[i] for i in order],
+            "Key":       [results.keys[i] for i in order],
+        })
 
         st.subheader("Ranked Candidates")
 
@@ -229,16 +372,7 @@ if tab_choice == "Resume Screening":
             disabled=True
         )
 
-        csv_df = df_top.apply(lambda row: {
-            "Candidate":        row["Candidate"],
-            "Score":            round(row["Score"], 3),
-            "Skill Score":      row["Breakdown"]["skill_score"],
-            "Experience Score": row["Breakdown"]["experience_score"],
-            "Semantic Score":   row["Breakdown"]["semantic_score"],
-            "Gap Score":        row["Breakdown"]["gap_score"],
-            "Skills":           ", ".join(row["Resume"]["skills"]),
-            "Years Experience": row["Resume"]["years_experience"],
-        }, axis=1).apply(pd.Series)
+        csv_df = results.to_frame(order, scores)
 
         st.download_button(
             "Download Results CSV",
@@ -247,18 +381,98 @@ if tab_choice == "Resume Screening":
             mime="text/csv"
         )
 
-        styles = getSampleStyleSheet()
+        with st.expander("Bias Audit"):
+            # Counterfactual re-score of the whole pool with demographic terms
+            # and names redacted. The redacted component matrix is kept (keyed
+            # by the result rows it was computed for), so the audit re-weights
+            # with the sidebar like the main ranking does.
+            audit = st.session_state.bias_audit
+            if audit is not None and audit[0] != (st.session_state.results_fingerprint, tuple(results.keys)):
+                audit = st.session_state.bias_audit = None
+            if st.button("Run Bias Audit"):
+                with st.spinner(f"Redacting and re-scoring {len(results)} resumes..."):
+                    audit = st.session_state.bias_audit = (
+                        (st.session_state.results_fingerprint, tuple(results.keys)),
+                        redacted_matrix(results, st.session_state.jd_emb)
+                    )
+            if audit is not None:
+                audit_df, audit_summary = audit_frame(results, audit[1], weights, int(top_n))
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Flagged", f"{audit_summary['flagged']}/{audit_summary['candidates']}")
+                col2.metric("Mean |Δ score|", audit_summary["mean_abs_delta"])
+                col3.metric("Max |rank shift|", audit_summary["max_abs_rank_shift"])
+                col4.metric("Top-N overlap", audit_summary["top_n_overlap"])
+                st.caption(f"Rank correlation (Spearman): {audit_summary['rank_correlation']}")
+                st.dataframe(audit_df, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "Download Bias Audit CSV",
+                    audit_df.to_csv(index=False),
+                    "bias_audit.csv",
+                    mime="text/csv"
+                )
 
-        full_buffer = io.BytesIO()
-        full_doc = SimpleDocTemplate(full_buffer)
-        full_elements = [
-            Paragraph("Full Screening Report", styles["Heading1"]),
-            Spacer(1, 0.3 * inch),
-            Paragraph("Selected Job Description:", styles["Heading2"]),
-            Paragraph(st.session_state.selected_jd, styles["Normal"]),
-            Spacer(1, 0.5 * inch),
+        # Questions are generated in the background in rank order; the table
+        # and expanders render straight away and pick results up as they land.
+        prefetcher = st.session_state.question_prefetcher
+        for candidate, resume in zip(df_top["Candidate"], df_top["Resume"]):
+            if candidate not in st.session_state.questions:
+                prefetcher.submit(candidate, st.session_state.jd_struct["summary"], resume["summary"])
+        collect_questions(df_top["Candidate"])
+
+        top_candidates = list(df_top["Candidate"])
+        # Failed jobs are not waited on (their expander offers Generate now);
+        # otherwise a shortlist with a failure would rerun forever.
+        waiting = [
+            c for c in top_candidates
+            if c not in st.session_state.questions and not prefetcher.failed(c)
         ]
 
+        @st.fragment(run_every=2 if waiting else None)
+        def question_progress():
+            ready, total = prefetcher.progress(waiting)
+            if waiting and ready == total:
+                st.rerun()
+            done = len(top_candidates) - total + ready
+            if done < len(top_candidates):
+                st.progress(
+                    done / len(top_candidates),
+                    text=f"Interview questions ready: {done}/{len(top_candidates)}"
+                )
+
+        question_progress()
+
+        report_rows = []
+        report_worker = st.session_state.report_worker
+
+        @st.fragment(run_every=1 if report_worker.futures else None)
+        def full_report():
+            # The merged report is built on a background worker; this fragment
+            # polls until it is ready so the rest of the page stays responsive.
+            jd_text = st.session_state.selected_jd
+            key = full_report_key(jd_text, [candidate_key(*r) for r in report_rows])
+            for stale in [k for k in report_worker.futures if k != key]:
+                report_worker.discard(stale)
+            if key in fragment_cache:
+                if key in report_worker.futures:
+                    # Done: drop the job and rerun once to stop polling.
+                    report_worker.discard(key)
+                    st.rerun()
+                st.download_button(
+                    "Download Full Screening Report",
+                    full_report_pdf(jd_text, report_rows),
+                    "full_screening_report.pdf",
+                    mime="application/pdf"
+                )
+            elif key in report_worker.futures:
+                if report_worker.ready(key) and report_worker.result(key) is None:
+                    report_worker.discard(key)
+                    st.error("Building the full report failed.")
+                else:
+                    st.caption("Preparing full screening report...")
+            elif st.button("Prepare Full Screening Report"):
+                report_worker.submit(key, jd_text, list(report_rows))
+                st.rerun()
+
         for _, row in df_top.iterrows():
             candidate = row["Candidate"]
 
@@ -267,6 +481,9 @@ if tab_choice == "Resume Screening":
                 st.markdown(f"**Name:** {candidate}")
                 st.markdown(f"**Skills:** {', '.join(row['Resume']['skills']) or 'None detected'}")
                 st.markdown(f"**Years Experience:** {row['Resume']['years_experience']}")
+                also = [name for key, name in st.session_state.duplicates.values() if key == row["Key"]]
+                if also:
+                    st.caption(f"Also received as: {', '.join(also)}")
 
                 bd = row["Breakdown"]
                 st.markdown("**Score Breakdown:**")
@@ -279,16 +496,22 @@ if tab_choice == "Resume Screening":
                 st.markdown("**Professional Summary:**")
                 st.write(row["Resume"]["summary"])
 
-                if candidate not in st.session_state.questions:
-                    with st.spinner("Generating interview questions..."):
-                        questions, _ = generate_questions(
-                            st.session_state.jd_struct["summary"],
-                            row["Resume"]["summary"]
-                        )
-                    st.session_state.questions[candidate] = questions
-
                 st.markdown("### Interview Questions")
-                st.write(st.session_state.questions[candidate])
+                if candidate in st.session_state.questions:
+                    st.write(st.session_state.questions[candidate])
+                elif st.button("Generate now", key=safe_key("questions", candidate)):
+                    stream = stream_questions(
+                        st.session_state.jd_struct["summary"],
+                        row["Resume"]["summary"]
+                    )
+                    st.write_stream(stream)
+                    if stream.text:
+                        st.session_state.questions[candidate] = stream.text
+                        prefetcher.discard(candidate)
+                elif prefetcher.failed(candidate):
+                    st.caption("Background generation failed; use Generate now to retry.")
+                else:
+                    st.caption("Queued for background generation.")
 
                 st.markdown("### Recruiter Notes")
                 note = st.text_area(
@@ -299,32 +522,106 @@ if tab_choice == "Resume Screening":
                 )
                 st.session_state.notes[candidate] = note
 
-                buffer = io.BytesIO()
-                doc = SimpleDocTemplate(buffer)
-                doc.build(build_candidate_elements(
+                # Reports are rendered only on request and memoized on their
+                # content, so reruns (e.g. editing notes) don't rebuild PDFs.
+                report_args = (
                     candidate, row["Score"], row["Resume"],
-                    st.session_state.questions[candidate],
-                    st.session_state.notes, styles
-                ))
-                st.download_button(
-                    f"Download {candidate} Report",
-                    buffer.getvalue(),
-                    f"{candidate}_report.pdf",
-                    mime="application/pdf",
-                    key=safe_key("pdf", candidate)
+                    st.session_state.questions.get(candidate, ""), note
                 )
+                report_rows.append(report_args)
+                if candidate_key(*report_args) in fragment_cache or st.button(
+                    "Prepare report", key=safe_key("prepare", candidate)
+                ):
+                    st.download_button(
+                        f"Download {candidate} Report",
+                        candidate_pdf(*report_args),
+                        f"{candidate}_report.pdf",
+                        mime="application/pdf",
+                        key=safe_key("pdf", candidate)
+                    )
 
-            full_elements += build_candidate_elements(
-                candidate, row["Score"], row["Resume"],
-                st.session_state.questions[candidate],
-                st.session_state.notes, styles
-            )
+        full_report()
 
-        full_doc.build(full_elements)
 
+    with st.expander("Diagnostics"):
+        # Timings and counters since the last Run Screening, including the
+        # background question and report work it triggered.
+        snapshot = st.session_state.metrics.snapshot()
+        st.caption(f"{snapshot['label']} — {snapshot['elapsed_s']}s since start")
+        if snapshot["stages"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(snapshot["stages"], orient="index"),
+                use_container_width=True
+            )
+        if snapshot["counters"]:
+            st.json(snapshot["counters"])
+        if snapshot["profile"]:
+            st.code(snapshot["profile"], language=None)
         st.download_button(
-            "Download Full Screening Report",
-            full_buffer.getvalue(),
-            "full_screening_report.pdf",
-            mime="application/pdf"
+            "Download Diagnostics JSON",
+            st.session_state.metrics.to_json(),
+            "screening_diagnostics.json",
+            mime="application/json"
         )
+
+
+if tab_choice == "Multi-JD Matrix":
+
+    # Screens one resume pool against every open role at once: each JD is
+    # parsed and embedded once, the pool once, and scores for all pairs come
+    # from one resumes x JDs matrix, so weights re-rank every role instantly.
+    weights, top_n = scoring_sidebar()
+
+    jd_files = st.file_uploader(
+        "Upload Job Descriptions (one file per role)",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=True,
+        key="multi_jd_files"
+    )
+    pool_files = st.file_uploader(
+        "Upload Resumes",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=True,
+        key="multi_jd_resumes"
+    )
+
+    if st.button("Screen Against All Roles"):
+        if not jd_files or not pool_files:
+            st.error("Upload at least one job description and one resume.")
+            st.stop()
+
+        with st.spinner(f"Scoring {len(pool_files)} resumes against {len(jd_files)} roles..."):
+            jds = [(os.path.splitext(f.name)[0], extract_text(f)) for f in jd_files]
+            file_hashes, structs, errors, duplicate_of = parse_files([(f.name, f.getvalue()) for f in pool_files])
+            for file, error in zip(pool_files, errors):
+                if error:
+                    st.warning(f"Skipped {file.name}: {error}")
+            merged = sum(link is not None for link in duplicate_of)
+            if merged:
+                st.info(f"Merged {merged} near-duplicate uploads into their original resumes.")
+            parsed = [i for i, struct in enumerate(structs) if struct is not None]
+            st.session_state.multi_jd = screen_many(
+                jds,
+                [file_hashes[i] for i in parsed],
+                [structs[i]["name"] or pool_files[i].name for i in parsed],
+                [structs[i] for i in parsed]
+            )
+
+    multi = st.session_state.multi_jd
+    if multi is not None and len(multi.keys):
+        st.subheader("Best Role per Candidate")
+        st.dataframe(multi.best_roles(weights), use_container_width=True, hide_index=True)
+
+        st.subheader("Ranking per Role")
+        role = st.selectbox("Role", range(len(multi.titles)), format_func=lambda j: multi.titles[j])
+        st.dataframe(multi.ranking_frame(role, weights, int(top_n)), use_container_width=True, hide_index=True)
+
+        with st.expander("Full Score Matrix"):
+            matrix_df = multi.matrix_frame(weights)
+            st.dataframe(matrix_df, use_container_width=True)
+            st.download_button(
+                "Download Score Matrix CSV",
+                matrix_df.to_csv(index_label="Candidate"),
+                "score_matrix.csv",
+                mime="text/csv"
+            )
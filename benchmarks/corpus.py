@@ -0,0 +1,176 @@
+"""Synthetic resume / JD corpus for the benchmarks.
+
+    python benchmarks/corpus.py --out /tmp/corpus --count 200 --formats pdf,docx,txt --words 600
+
+Resumes are built from the skill taxonomy and a fixed vocabulary with a
+seeded RNG, so the same arguments always produce the same corpus. Each resume
+has a name line, the usual sections, roles and roughly --words words; some
+resumes state no years of experience and date their roles in other styles,
+partly or not at all (see DATE_STYLES). Files are spread round-robin over
+--formats.
+"""
+import io
+import os
+import sys
+import json
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIRST_NAMES = [
+    "Aisha", "Carlos", "Mei", "James", "Priya", "Olga", "Kwame", "Sofia",
+    "Liam", "Hana", "Mateo", "Fatima", "Noah", "Ingrid", "Ravi", "Chloe",
+]
+LAST_NAMES = [
+    "Khan", "Garcia", "Chen", "Smith", "Patel", "Ivanova", "Mensah", "Rossi",
+    "Murphy", "Tanaka", "Silva", "Haddad", "Brown", "Larsen", "Iyer", "Martin",
+]
+TITLES = [
+    "Software Engineer", "Backend Developer", "Data Scientist", "DevOps Engineer",
+    "Machine Learning Engineer", "Frontend Developer", "Data Engineer", "Platform Engineer",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Systems", "Wayne Analytics"]
+FILLER = (
+    "designed built maintained scalable services pipelines teams customers latency "
+    "reliability delivered features migrated systems improved performance led reviews "
+    "mentored engineers automated deployments reduced costs collaborated stakeholders "
+    "analysed requirements shipped releases monitored incidents optimised queries"
+).split()
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def taxonomy_skills():
+    from services.skills import skill_matcher
+    return skill_matcher.skills
+
+
+def sentence(rng, skills, length=14):
+    words = [rng.choice(FILLER) for _ in range(length)]
+    words[rng.randrange(length)] = rng.choice(skills)
+    return " ".join(words).capitalize() + "."
+
+
+# How a resume dates its roles: every role in the "Mon YYYY - Mon YYYY"
+# style, every role in a mix of styles, only some roles, or none. Together
+# with the share of resumes that never state "N+ years", this sets how often
+# the years parser has to fall back to the LLM.
+DATE_STYLES = {"full": 0.5, "mixed": 0.25, "partial": 0.15, "undated": 0.1}
+YEARS_CLAIM_SHARE = 0.7
+
+
+def date_range(rng, style, start, end, current):
+    if style == "undated" or style == "partial" and rng.random() < 0.5:
+        return ""
+    if style == "mixed":
+        until = "Present" if current else None
+        return rng.choice([
+            f"{rng.choice(MONTHS)} {start} – {until or f'{rng.choice(MONTHS)} {end}'}",
+            f"{rng.randint(1, 12):02d}/{start}-{until or f'{rng.randint(1, 12):02d}/{end}'}",
+            f"{start} to {until or end}",
+        ])
+    return f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {end}"
+
+
+def make_resume(rng, skills, words=600):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    own_skills = rng.sample(skills, 12)
+    style = rng.choices(list(DATE_STYLES), weights=list(DATE_STYLES.values()))[0]
+    lines = [name, f"{name.split()[0].lower()}@example.com", "", "Summary"]
+    if rng.random() < YEARS_CLAIM_SHARE:
+        lines.append(f"{rng.choice(TITLES)} with {rng.randint(1, 15)}+ years of experience. "
+                     + sentence(rng, own_skills))
+    else:
+        lines.append(sentence(rng, own_skills))
+    lines += ["", "Experience"]
+
+    year = 2024
+    body = sum(len(l.split()) for l in lines)
+    while body < words * 0.8:
+        start = year - rng.randint(1, 4)
+        dates = date_range(rng, style, start, year, current=year == 2024)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}  {dates}".rstrip())
+        for _ in range(rng.randint(3, 6)):
+            bullet = "- " + sentence(rng, own_skills)
+            lines.append(bullet)
+            body += len(bullet.split())
+        year = start
+    lines += ["", "Education", f"B.Sc. Computer Science, State University {year - 4} - {year}"]
+    lines += ["", "Skills", ", ".join(own_skills)]
+    return name, "\n".join(lines)
+
+
+def make_jd(rng, skills):
+    required = rng.sample(skills, 8)
+    return "\n".join([
+        f"{rng.choice(TITLES)}",
+        "",
+        "Responsibilities",
+        sentence(rng, required), sentence(rng, required), sentence(rng, required),
+        "",
+        "Requirements",
+        f"{rng.randint(2, 8)}+ years of experience.",
+        "Required skills: " + ", ".join(required),
+    ])
+
+
+def to_pdf(text):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+    styles = getSampleStyleSheet()
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer).build([Paragraph(line or "&nbsp;", styles["Normal"]) for line in text.splitlines()])
+    return buffer.getvalue()
+
+
+def to_docx(text):
+    from docx import Document
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+ENCODERS = {"pdf": to_pdf, "docx": to_docx, "txt": lambda text: text.encode("utf-8")}
+
+
+def write_corpus(directory, count, formats=("pdf", "docx", "txt"), words=600, seed=0):
+    # Returns (jd_text, [(path, name)]) for the generated resumes.
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    skills = taxonomy_skills()
+    jd_text = make_jd(rng, skills)
+    with open(os.path.join(directory, "jd.txt"), "w") as f:
+        f.write(jd_text)
+
+    files = []
+    for i in range(count):
+        name, text = make_resume(rng, skills, words)
+        fmt = formats[i % len(formats)]
+        path = os.path.join(directory, f"resume_{i:05d}.{fmt}")
+        with open(path, "wb") as f:
+            f.write(ENCODERS[fmt](text))
+        files.append((path, name))
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump({"count": count, "formats": list(formats), "words": words, "seed": seed, "files": files}, f)
+    return jd_text, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    _, files = write_corpus(args.out, args.count, args.formats.split(","), args.words, args.seed)
+    print(f"Wrote {len(files)} resumes and jd.txt to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
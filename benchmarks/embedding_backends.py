@@ -0,0 +1,104 @@
+"""Parity and CPU throughput of the embedding backends.
+
+    python benchmarks/embedding_backends.py --sentences 2000 --threads 4
+    python benchmarks/embedding_backends.py --min-cosine 0.98   # exit 1 below this
+
+Encodes the same synthetic resume chunks with the full-precision torch
+backend and the int8 ONNX backend. It reports per-sentence cosine agreement
+between the two, how often the top-10 chunks for a JD agree, and
+sentences/sec for each backend, all as JSON. The exit status is non-zero if
+any sentence's cosine falls below --min-cosine, so this can gate a backend
+change in CI.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+from benchmarks.corpus import make_resume, make_jd, taxonomy_skills
+from services.embedding_backends import TorchBackend, OnnxBackend, EMBEDDING_THREADS
+from services.scorer import MODEL_NAME
+from utils.text import chunk_text
+
+
+def sentences(count, seed):
+    rng = random.Random(seed)
+    skills = taxonomy_skills()
+    jd = make_jd(rng, skills)
+    texts = []
+    while len(texts) < count:
+        _, resume = make_resume(rng, skills)
+        texts += chunk_text(resume)
+    return jd, texts[:count]
+
+
+def throughput(backend, texts, batch_size, repeat):
+    backend.encode(texts[:batch_size], batch_size=batch_size)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vectors = backend.encode(texts, batch_size=batch_size)
+        best = min(best, time.perf_counter() - start)
+    return np.asarray(vectors, dtype=np.float32), round(len(texts) / best, 1)
+
+
+def normalize(vectors):
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=EMBEDDING_THREADS, help="CPU threads for both backends")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    # Same thread budget for both, so the comparison is precision and runtime only.
+    import torch
+    torch.set_num_threads(args.threads)
+
+    jd, texts = sentences(args.sentences, args.seed)
+    report = {
+        "model": MODEL_NAME, "sentences": len(texts), "batch_size": args.batch_size,
+        "threads": args.threads, "backends": {},
+    }
+    vectors, queries = {}, {}
+    for name, backend in [
+        ("torch", TorchBackend(MODEL_NAME)),
+        ("onnx", OnnxBackend(MODEL_NAME, threads=args.threads)),
+    ]:
+        vectors[name], rate = throughput(backend, texts, args.batch_size, args.repeat)
+        queries[name] = normalize(np.asarray(backend.encode(jd), dtype=np.float32))
+        report["backends"][name] = {"sentences_per_s": rate}
+
+    reference, candidate = normalize(vectors["torch"]), normalize(vectors["onnx"])
+    cosine = np.sum(reference * candidate, axis=1)
+    top_ref = set(np.argsort(-(reference @ queries["torch"]))[:10])
+    top_cand = set(np.argsort(-(candidate @ queries["onnx"]))[:10])
+    report["parity"] = {
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "min_cosine": round(float(cosine.min()), 5),
+        "p01_cosine": round(float(np.percentile(cosine, 1)), 5),
+        "top10_overlap": len(top_ref & top_cand) / 10,
+    }
+    report["speedup"] = round(
+        report["backends"]["onnx"]["sentences_per_s"] / report["backends"]["torch"]["sentences_per_s"], 2
+    )
+    report["passed"] = bool(cosine.min() >= args.min_cosine)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
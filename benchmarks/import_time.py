@@ -0,0 +1,78 @@
+"""Cold-import cost of the service modules, optionally against another revision.
+
+    python benchmarks/import_time.py                  # this checkout
+    python benchmarks/import_time.py --compare HEAD~1 # plus an older revision
+
+Each module is imported in a fresh interpreter --repeat times and the median
+wall time is reported as JSON. Modules that fail to import (missing optional
+dependencies, for example) are reported with their error instead of a time.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "services.parser",
+    "services.scorer",
+    "services.scorer_bac",
+    "services.llm",
+    "services.interview",
+    "services.jd_optimizer",
+    "services.bias",
+    "utils.text",
+]
+
+PROBE = (
+    "import time, importlib; t = time.perf_counter(); "
+    "importlib.import_module({module!r}); print(time.perf_counter() - t)"
+)
+
+
+def time_import(module, cwd, repeat):
+    samples = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=cwd, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"error": lines[-1] if lines else f"exit {proc.returncode}"}
+        samples.append(float(proc.stdout.strip().splitlines()[-1]))
+    return {"median_s": round(statistics.median(samples), 4), "max_s": round(max(samples), 4)}
+
+
+def measure(cwd, repeat):
+    return {module: time_import(module, cwd, repeat) for module in MODULES}
+
+
+def export_revision(rev, target):
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev], cwd=ROOT, capture_output=True, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare", metavar="REV", help="git revision to measure as the baseline")
+    args = parser.parse_args()
+
+    report = {"current": measure(ROOT, args.repeat)}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.compare, tmp)
+            report[args.compare] = measure(tmp, args.repeat)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Local stand-in for the OpenAI-compatible chat completions endpoint.
+
+Answers every request after a fixed --latency with a canned reply shaped
+for the prompt (an integer for the years prompt, a name for the name prompt,
+a question list otherwise), streamed or not, so benchmarks exercise the real
+client without network access or rate limits.
+
+    python benchmarks/llm_stub.py --port 8765 --latency 0.2
+    GROQ_BASE_URL=http://127.0.0.1:8765/v1 GROQ_API_KEY=stub streamlit run app.py
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+QUESTIONS = "\n".join(f"{i}. Describe a project where you used this skill." for i in range(1, 6))
+
+
+def reply_for(prompt):
+    if "Return only an integer" in prompt:
+        return "5"
+    if "full name" in prompt.lower():
+        return "Jane Doe"
+    return QUESTIONS
+
+
+def make_handler(latency):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            content = reply_for(body["messages"][0]["content"])
+            base = {"id": "stub", "created": 0, "model": body["model"]}
+
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for word in content.split(" "):
+                    chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                        {"index": 0, "delta": {"content": word + " "}, "finish_reason": None}
+                    ]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                return
+
+            data = json.dumps({**base, "object": "chat.completion", "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ], "usage": {"prompt_tokens": 0, "completion_tokens": len(content) // 4, "total_tokens": 0}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start(port=0, latency=0.05):
+    # Serves on a daemon thread; returns the base URL to use as GROQ_BASE_URL.
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency))
+    print(f"LLM stub on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Extraction, parsing, scoring and end-to-end screening benchmarks.
+
+    python benchmarks/run.py --count 200 --out bench.json
+    python benchmarks/run.py --count 200 --baseline bench.json   # compare to an earlier run
+
+A synthetic corpus (benchmarks/corpus.py) is generated once, then every stage
+runs in a fresh interpreter with its own empty cache directory, so stages do
+not warm each other's caches and each reports its own peak RSS. The LLM is
+served by benchmarks/llm_stub.py on a local port. Per-call stages report
+p50/p95 latency; every stage reports throughput in items per second.
+Stages whose dependencies are missing report their error instead.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import resource
+import platform
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+STAGES = [
+    "extract",
+    "parse_name_heuristic",
+    "parse_name_ner",
+    "parse_name_filename",
+    "parse_name_llm",
+    "parse_years_regex",
+    "parse_years_dates",
+    "parse_years_llm",
+    "parse_skills",
+    "parse_batch",
+    "score",
+    "end_to_end",
+    "end_to_end_warm",
+]
+
+WEIGHTS = {"Skills": 0.3, "Experience": 0.2, "Semantic": 0.3, "Skill Gap": 0.2}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(samples=None, count=None, total=None):
+    # Per-call samples give latency percentiles; batch stages pass count/total.
+    if samples is not None:
+        count, total = len(samples), sum(samples)
+    result = {
+        "count": count,
+        "total_s": round(total, 4),
+        "throughput_per_s": round(count / total, 2) if total else None,
+    }
+    if samples:
+        result["p50_ms"] = round(percentile(samples, 0.5) * 1000, 3)
+        result["p95_ms"] = round(percentile(samples, 0.95) * 1000, 3)
+        result["mean_ms"] = round(statistics.mean(samples) * 1000, 3)
+    return result
+
+
+def per_call(fn, inputs):
+    samples = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def batch(fn, count):
+    start = time.perf_counter()
+    fn()
+    return summarize(count=count, total=time.perf_counter() - start)
+
+
+def load_texts(files):
+    from utils.text import extract_bytes
+    texts = []
+    for path, _ in files:
+        with open(path, "rb") as f:
+            texts.append(extract_bytes(path, f.read()))
+    return texts
+
+
+def run_stage(stage, corpus_dir):
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        files = json.load(f)["files"]
+    with open(os.path.join(corpus_dir, "jd.txt")) as f:
+        jd_text = f.read()
+    filenames = [os.path.basename(path) for path, _ in files]
+
+    if stage == "extract":
+        from utils.text import extract_text
+
+        def extract(path):
+            with open(path, "rb") as f:
+                extract_text(f)
+        return per_call(extract, [path for path, _ in files])
+
+    from services import parser
+    texts = load_texts(files)
+
+    if stage == "parse_name_heuristic":
+        return per_call(parser.extract_name_heuristic, texts)
+    if stage == "parse_name_ner":
+        nlp = parser.get_nlp()
+        return per_call(lambda text: parser.extract_name_ner(nlp(text[:2000])), texts)
+    if stage == "parse_name_filename":
+        # Corpus filenames are not names, so this measures the miss path.
+        return per_call(parser.extract_name_filename, filenames)
+    if stage == "parse_name_llm":
+        return per_call(parser.extract_name_llm, texts)
+    if stage == "parse_years_regex":
+        return per_call(parser.extract_years_regex, texts)
+    if stage == "parse_years_dates":
+        return per_call(parser.extract_years_from_dates, texts)
+    if stage == "parse_years_llm":
+        return per_call(parser.extract_years_llm, texts)
+    if stage == "parse_skills":
+        return per_call(parser.extract_skills, texts)
+    if stage == "parse_batch":
+        from utils.instrument import metrics
+        parser.get_nlp()
+        result = batch(lambda: parser.parse_resumes(texts, filenames), len(texts))
+        counters = metrics.snapshot()["counters"]
+        result["years_llm_rate"] = round(counters.get("years_llm_fallbacks", 0) / len(texts), 4) if texts else None
+        return result
+
+    from services.scorer import score_candidate, score_candidates, embed, get_model
+    get_model()
+    jd_struct = parser.parse_jd(jd_text)
+    jd_embedding = embed(jd_struct["summary"])
+
+    if stage == "score":
+        structs = parser.parse_resumes(texts, filenames)
+        return per_call(lambda s: score_candidate(jd_struct, s, jd_embedding, WEIGHTS), structs)
+
+    if stage in ("end_to_end", "end_to_end_warm"):
+        from services.pipeline import parse_files
+        parser.get_nlp()
+        items = []
+        for path, _ in files:
+            with open(path, "rb") as f:
+                items.append((os.path.basename(path), f.read()))
+
+        def screen():
+            _, structs, _, _ = parse_files(items)
+            score_candidates(jd_struct, [s for s in structs if s is not None], jd_embedding, WEIGHTS)
+
+        if stage == "end_to_end_warm":
+            # Second screening of the same pool: parse and embedding caches hit.
+            screen()
+        return batch(screen, len(items))
+
+    raise ValueError(f"unknown stage {stage}")
+
+
+def stage_main(stage, corpus_dir):
+    # Child process entry: prints one JSON object on stdout.
+    try:
+        result = run_stage(stage, corpus_dir)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(json.dumps(result))
+
+
+def spawn_stage(stage, corpus_dir, llm_url):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {
+            **os.environ,
+            "RESUME_SCREENER_CACHE_DIR": cache_dir,
+            "GROQ_BASE_URL": llm_url,
+            "GROQ_API_KEY": "stub",
+            "LLM_REQUESTS_PER_MINUTE": "100000",
+            "LLM_TOKENS_PER_MINUTE": "100000000",
+        }
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--stage", stage, "--corpus", corpus_dir],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        err = proc.stderr.strip().splitlines()
+        return {"error": err[-1] if err else f"exit {proc.returncode}"}
+    return json.loads(lines[-1])
+
+
+def revision():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def compare(report, baseline):
+    # Ratios current / baseline: >1 means slower (p50) or faster (throughput).
+    deltas = {}
+    for stage, current in report["stages"].items():
+        before = baseline.get("stages", {}).get(stage, {})
+        if "error" in current or "error" in before:
+            continue
+        delta = {}
+        for metric in ("p50_ms", "p95_ms", "throughput_per_s", "peak_rss_mb"):
+            if current.get(metric) and before.get(metric):
+                delta[metric] = round(current[metric] / before[metric], 3)
+        if delta:
+            deltas[stage] = delta
+    return {"baseline_revision": baseline.get("revision"), "ratios": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="resumes in the corpus")
+    parser.add_argument("--words", type=int, default=600, help="approximate words per resume")
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub LLM seconds per request")
+    parser.add_argument("--corpus", help="reuse an existing corpus directory")
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--stage", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        stage_main(args.stage, args.corpus)
+        return
+
+    from benchmarks import corpus, llm_stub
+    llm_url = llm_stub.start(latency=args.llm_latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            corpus_dir = tmp
+            corpus.write_corpus(corpus_dir, args.count, args.formats.split(","), args.words, args.seed)
+        with open(os.path.join(corpus_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+
+        report = {
+            "revision": revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": {k: manifest[k] for k in ("count", "formats", "words", "seed")},
+            "llm_latency_s": args.llm_latency,
+            "stages": {},
+        }
+        for stage in args.stages.split(","):
+            print(f"running {stage}...", file=sys.stderr)
+            report["stages"][stage] = spawn_stage(stage, corpus_dir, llm_url)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Headless batch screening.
+
+    python screen.py --jd jd.pdf --resumes ./pool --out results.jsonl
+    python screen.py --jd jd.txt --resumes "pool/**/*.pdf" --out results.csv --resume
+
+Resumes stream through extraction -> parsing -> scoring in batches of
+--batch-size, and each batch is appended to --out (JSONL or CSV, by extension)
+before the next one is read, so memory stays bounded by the batch size. With
+--resume, files already present in --out are skipped, which makes an
+interrupted run restartable from where it stopped.
+"""
+import os
+import csv
+import sys
+import glob
+import json
+import logging
+import argparse
+from itertools import islice
+from services.parser import parse_jd
+from services.pipeline import parse_files
+from services.dedup import NearDuplicateIndex
+from services.scorer import score_candidates, embed
+from utils.text import extract_bytes
+from utils.instrument import metrics, profiled, PROFILE_MODE
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+CSV_FIELDS = [
+    "file", "sha256", "candidate", "score",
+    "skill_score", "experience_score", "semantic_score", "gap_score",
+    "years_experience", "skills", "error", "duplicate_of",
+]
+
+
+def iter_resume_paths(source):
+    if os.path.isdir(source):
+        for root, _, names in os.walk(source):
+            for name in sorted(names):
+                if name.lower().endswith(RESUME_EXTENSIONS):
+                    yield os.path.join(root, name)
+    else:
+        for path in sorted(glob.iglob(source, recursive=True)):
+            if os.path.isfile(path) and path.lower().endswith(RESUME_EXTENSIONS):
+                yield path
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _csv_records(f):
+    # (row, end offset in bytes, ends with a newline) per CSV record of a
+    # binary file; the reader pulls exactly the lines each record spans.
+    consumed = [0, b""]
+
+    def lines():
+        for raw in f:
+            consumed[0] += len(raw)
+            consumed[1] = raw
+            yield raw.decode("utf-8")
+
+    for row in csv.reader(lines()):
+        yield row, consumed[0], consumed[1].endswith(b"\n")
+
+
+def load_checkpoint(out_path):
+    # Files already written to out_path. A record cut off by an interruption
+    # (a partial JSONL line, or a CSV row that is unterminated or short of
+    # fields) is truncated away, so that file is screened again and appending
+    # resumes cleanly.
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    valid_end = 0
+    with open(out_path, "rb") as f:
+        if out_path.endswith(".csv"):
+            for n, (row, end, complete) in enumerate(_csv_records(f)):
+                if not complete or len(row) != len(CSV_FIELDS):
+                    break
+                if n:
+                    done.add(row[0])
+                valid_end = end
+        else:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    done.add(json.loads(line)["file"])
+                except (ValueError, KeyError):
+                    break
+                valid_end += len(line)
+    with open(out_path, "r+b") as f:
+        f.truncate(valid_end)
+    return done
+
+
+def screen(jd_struct, jd_embedding, paths, weights, batch_size):
+    # Generator of result rows, one batch of files in memory at a time. One
+    # near-duplicate index spans the run, so a copy is matched to its first
+    # occurrence in any earlier batch and reported with duplicate_of set to
+    # that file's path instead of a score.
+    dedup_index = NearDuplicateIndex()
+    first_path = {}
+    for batch in batched(paths, batch_size):
+        items = []
+        for path in batch:
+            with open(path, "rb") as f:
+                items.append((os.path.basename(path), f.read()))
+
+        file_hashes, structs, errors, duplicate_of = parse_files(items, dedup_index)
+        parsed = [i for i, struct in enumerate(structs) if struct is not None]
+        scored = score_candidates(jd_struct, [structs[i] for i in parsed], jd_embedding, weights)
+        scores = dict(zip(parsed, scored))
+
+        for i, path in enumerate(batch):
+            first_path.setdefault(file_hashes[i], path)
+            row = {"file": path, "sha256": file_hashes[i], "error": errors[i]}
+            if duplicate_of[i] is not None:
+                row["duplicate_of"] = first_path.get(duplicate_of[i])
+            if i in scores:
+                total_score, breakdown, _ = scores[i]
+                row.update({
+                    "candidate": structs[i]["name"] or items[i][0],
+                    "score": total_score,
+                    **breakdown,
+                    "years_experience": structs[i]["years_experience"],
+                    "skills": structs[i]["skills"],
+                })
+            yield row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a pool of resumes against a job description.")
+    parser.add_argument("--jd", required=True, help="job description file (.pdf, .docx or .txt)")
+    parser.add_argument("--resumes", required=True, help="directory or glob of resume files")
+    parser.add_argument("--out", required=True, help="output path ending in .jsonl or .csv")
+    parser.add_argument("--resume", action="store_true", help="skip files already in --out and append")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--w-skills", type=float, default=0.3)
+    parser.add_argument("--w-experience", type=float, default=0.2)
+    parser.add_argument("--w-semantic", type=float, default=0.3)
+    parser.add_argument("--w-gap", type=float, default=0.2)
+    parser.add_argument("--metrics", help="write per-stage timings and counters to this JSON file")
+    parser.add_argument("--profile", choices=["off", "cprofile", "pyinstrument"], default=PROFILE_MODE,
+                        help="profile the run; the report is included in --metrics")
+    args = parser.parse_args(argv)
+    # LLM and other service errors are reported through logging.
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr, format="%(levelname)s %(name)s: %(message)s")
+
+    weights = {
+        "Skills":     args.w_skills,
+        "Experience": args.w_experience,
+        "Semantic":   args.w_semantic,
+        "Skill Gap":  args.w_gap,
+    }
+
+    metrics.start_run("screen.py")
+    with open(args.jd, "rb") as f:
+        jd_text = extract_bytes(os.path.basename(args.jd), f.read())
+    jd_struct = parse_jd(jd_text)
+    jd_embedding = embed(jd_struct["summary"])
+
+    done = load_checkpoint(args.out) if args.resume else set()
+    paths = (p for p in iter_resume_paths(args.resumes) if p not in done)
+
+    with profiled(args.profile):
+        as_csv = args.out.endswith(".csv")
+        append = args.resume and os.path.exists(args.out) and os.path.getsize(args.out) > 0
+        count = 0
+        with open(args.out, "a" if append else "w", newline="") as out:
+            writer = csv.DictWriter(out, CSV_FIELDS) if as_csv else None
+            if writer and not append:
+                writer.writeheader()
+            for row in screen(jd_struct, jd_embedding, paths, weights, args.batch_size):
+                if writer:
+                    writer.writerow({**row, "skills": ", ".join(row.get("skills", []))})
+                else:
+                    out.write(json.dumps(row) + "\n")
+                count += 1
+                if count % args.batch_size == 0:
+                    out.flush()
+                    print(f"{count} resumes screened", file=sys.stderr)
+
+    print(f"Done: {count} resumes screened ({len(done)} skipped from checkpoint)", file=sys.stderr)
+    if args.metrics:
+        with open(args.metrics, "w") as f:
+            f.write(metrics.to_json())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,167 @@
+import os
 import re
+import json
+import numpy as np
+import pandas as pd
+from services.ranking import COMPONENTS, weight_vector
+from services.scorer import semantic_scores
+from utils.instrument import timed
+
+DEFAULT_TERMS_PATH = os.path.join(os.path.dirname(__file__), "data", "sensitive_terms.json")
+SENSITIVE_TERMS_PATH = os.getenv("SENSITIVE_TERMS_PATH", DEFAULT_TERMS_PATH)
+
+NAME_PATTERN = r"[A-Z][a-z]+\s[A-Z][a-z]+"
+REDACTED = "[REDACTED]"
+BIAS_DELTA_THRESHOLD = 0.07
+
+_END = ""
+
+
+def load_terms(path=SENSITIVE_TERMS_PATH):
+    # {"category": ["term", ...], ...}; multi-word terms match across any
+    # run of whitespace.
+    with open(path) as f:
+        return json.load(f)
+
+
+def trie_pattern(terms):
+    # Prefix-factored alternation ("marri(?:ed)", "m(?:ale|arried)", ...), so
+    # the regex engine follows one branch per character instead of trying
+    # every term at every position; an optional tail keeps matches longest.
+    root = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[_END] = True
+
+    def emit(node):
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char != _END
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if _END in node:
+            return f"(?:{body})?"
+        return body
+
+    return emit(root)
+
+
+class Redactor:
+    # Every sensitive term plus the two-capitalised-words name pattern in one
+    # compiled regex, applied in a single pass. Terms are case-insensitive and
+    # matched on word boundaries ("white" does not fire on "whitespace").
+
+    def __init__(self, terms, name_pattern=NAME_PATTERN):
+        self.terms = sorted({" ".join(t.lower().split()) for t in terms if t.strip()})
+        self.pattern = re.compile(rf"(?i:\b{trie_pattern(self.terms)}\b)|{name_pattern}")
+
+    def redact(self, text):
+        return self.pattern.sub(REDACTED, text)
+
+    def redact_many(self, texts):
+        sub = self.pattern.sub
+        return [sub(REDACTED, text) for text in texts]
+
+
+SENSITIVE_TERMS = sorted({term for terms in load_terms().values() for term in terms})
+
+redactor = Redactor(SENSITIVE_TERMS)
 
-SENSITIVE_TERMS = [
-    "male","female","married","single",
-    "indian","american","asian","christian",
-    "muslim","hindu","black","white"
-]
 
 def redact(text):
-    redacted = text
-    for term in SENSITIVE_TERMS:
-        redacted = re.sub(term, "[REDACTED]", redacted, flags=re.IGNORECASE)
-    redacted = re.sub(r"[A-Z][a-z]+\s[A-Z][a-z]+", "[REDACTED]", redacted)
-    return redacted
+    return redactor.redact(text)
+
+
+def redact_many(texts):
+    return redactor.redact_many(texts)
+
 
 def analyze_bias(original_score, redacted_score):
     delta = abs(original_score - redacted_score)
-    if delta > 0.07:
+    if delta > BIAS_DELTA_THRESHOLD:
         return f"Score changed by {round(delta,3)} after redaction"
-    return "No material bias detected"
\ No newline at end of file
+    return "No material bias detected"
+
+
+def redacted_structs(resume_structs):
+    # Skills and years are kept from the original parse: the name pattern also
+    # catches capitalised skill phrases ("Machine Learning"), and neither field
+    # is a demographic signal, so only the embedded text is counterfactual.
+    texts = redact_many([r.get("text") or r["summary"] for r in resume_structs])
+    return [
+        {**r, "text": text, "summary": text[:1000]}
+        for r, text in zip(resume_structs, texts)
+    ]
+
+
+def redacted_matrix(results, jd_embedding):
+    # Counterfactual component matrix for a whole ScreeningResults: every
+    # resume is redacted in one pass and all redacted chunks go through a
+    # single embed_many call, so auditing costs one batched embedding pass.
+    # Skills and years are kept from the original parse, so only the semantic
+    # column can change; the others are copied from results.matrix. Redacted
+    # vectors are not written to the embedding cache.
+    with timed("bias_audit", items=len(results)):
+        structs = redacted_structs(results.resumes)
+        semantic, _ = semantic_scores(structs, jd_embedding, store_misses=False)
+        matrix = np.array(results.matrix, dtype=np.float64)
+        # Rounded like build_breakdown so an unchanged score gives a zero delta.
+        matrix[:, COMPONENTS.index("semantic_score")] = np.round(semantic, 3)
+        return matrix
+
+
+def _ranks(scores):
+    # 1-based position of each row when sorted best first.
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def audit_frame(results, redacted, weights, top_n=None):
+    # Re-weighting is a matrix product on both sides, so the audit follows the
+    # sidebar weights without re-embedding. Returns (per-candidate frame,
+    # pool summary); a positive rank shift means the candidate moved up once
+    # demographic signals were removed.
+    w = weight_vector(weights)
+    original, counterfactual = results.matrix @ w, redacted @ w
+    delta = counterfactual - original
+    ranks, redacted_ranks = _ranks(original), _ranks(counterfactual)
+    shift = ranks - redacted_ranks
+    component_delta = redacted - results.matrix
+
+    frame = pd.DataFrame({
+        "Candidate":      results.candidates,
+        "Score":          np.round(original, 3),
+        "Redacted Score": np.round(counterfactual, 3),
+        "Delta":          np.round(delta, 3),
+        "Rank":           ranks,
+        "Redacted Rank":  redacted_ranks,
+        "Rank Shift":     shift,
+        **{f"Δ {c}": np.round(component_delta[:, j], 3) for j, c in enumerate(COMPONENTS)},
+        "Verdict":        [analyze_bias(o, r) for o, r in zip(original, counterfactual)],
+    }).sort_values("Rank").reset_index(drop=True)
+
+    n = len(results)
+    summary = {
+        "candidates": n,
+        "flagged": int(np.sum(np.abs(delta) > BIAS_DELTA_THRESHOLD)),
+        "mean_abs_delta": round(float(np.mean(np.abs(delta))), 4) if n else 0.0,
+        "max_abs_delta": round(float(np.max(np.abs(delta))), 4) if n else 0.0,
+        "mean_abs_rank_shift": round(float(np.mean(np.abs(shift))), 2) if n else 0.0,
+        "max_abs_rank_shift": int(np.max(np.abs(shift))) if n else 0,
+        # Spearman correlation between the two rankings (no ties by construction).
+        "rank_correlation": (
+            round(1 - 6 * float(np.sum(shift.astype(np.float64) ** 2)) / (n * (n * n - 1)), 4)
+            if n > 1 else 1.0
+        ),
+    }
+    if top_n:
+        k = min(int(top_n), n)
+        summary["top_n_overlap"] = round(
+            len(set(np.flatnonzero(ranks <= k)) & set(np.flatnonzero(redacted_ranks <= k))) / k, 3
+        ) if k else 1.0
+    return frame, summary
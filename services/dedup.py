@@ -0,0 +1,128 @@
+import os
+import re
+import zlib
+import numpy as np
+from utils.instrument import timed, count
+
+DEDUP_ENABLED = os.getenv("DEDUP", "1") == "1"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_SHINGLE_WORDS = 5
+DEDUP_NUM_PERM = 128
+DEDUP_BANDS = 16
+
+_PRIME = np.uint64(4294967311)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, k=DEDUP_SHINGLE_WORDS):
+    # Hashed k-word shingles of the normalised text, so a PDF and a DOCX of
+    # the same resume (different whitespace, bullets, punctuation) agree.
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    if len(words) < k:
+        return np.array([zlib.crc32(" ".join(words).encode())], dtype=np.uint64)
+    return np.unique(np.array(
+        [zlib.crc32(" ".join(words[i:i + k]).encode()) for i in range(len(words) - k + 1)],
+        dtype=np.uint64
+    ))
+
+
+class MinHasher:
+    # num_perm universal hashes (a * x + b) mod p over 32-bit shingle hashes;
+    # a < 2^31 keeps a * x inside uint64.
+
+    def __init__(self, num_perm=DEDUP_NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes):
+        if not len(hashes):
+            return None
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    # MinHash signatures bucketed by LSH bands: a new text is compared only
+    # with entries sharing at least one band, so lookups stay sub-linear in
+    # the pool size. Candidates are confirmed by estimated Jaccard similarity
+    # >= threshold. Clusters are stars around the first text seen, which is
+    # the representative every later near-duplicate links to.
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(self.rows * bands)
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.representative = {}
+
+    def __contains__(self, key):
+        return key in self.representative
+
+    def __len__(self):
+        return len(self.representative)
+
+    def retain(self, keys):
+        # Drops every entry whose cluster representative is not in `keys`, so
+        # nothing links to a resume that is no longer part of the results.
+        keep = set(keys)
+        gone = {key for key, rep in self.representative.items() if rep not in keep}
+        if not gone:
+            return
+        for key in gone:
+            del self.signatures[key]
+            del self.representative[key]
+        for band in self.buckets:
+            for band_key in list(band):
+                members = [key for key in band[band_key] if key not in gone]
+                if members:
+                    band[band_key] = members
+                else:
+                    del band[band_key]
+
+    def _band_keys(self, signature):
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def add(self, key, text):
+        # Returns the representative key if `text` near-duplicates an indexed
+        # one, else None (and `key` becomes a representative). Re-adding a key
+        # (byte-identical file) returns its cluster's representative.
+        if key in self.representative:
+            return self.representative[key]
+        signature = self.hasher.signature(shingles(text))
+        if signature is None:
+            return None
+        band_keys = self._band_keys(signature)
+
+        match = None
+        seen = set()
+        for band, band_key in zip(self.buckets, band_keys):
+            for other in band.get(band_key, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if np.mean(self.signatures[other] == signature) >= self.threshold:
+                    match = self.representative[other]
+                    break
+            if match is not None:
+                break
+
+        self.signatures[key] = signature
+        self.representative[key] = match if match is not None else key
+        for band, band_key in zip(self.buckets, band_keys):
+            band.setdefault(band_key, []).append(key)
+        return match
+
+
+def find_duplicates(keys, texts, index=None):
+    # [representative key or None] aligned with keys. Pass a pre-seeded index
+    # to also match against texts from earlier batches.
+    if index is None:
+        index = NearDuplicateIndex()
+    with timed("dedup", items=len(keys)):
+        links = [index.add(key, text) if text else None for key, text in zip(keys, texts)]
+    count("near_duplicates", sum(link is not None for link in links))
+    return links
@@ -0,0 +1,111 @@
+import os
+import numpy as np
+from utils.cache import cache_path
+
+# "torch" runs the model through sentence-transformers in full precision;
+# "onnx" runs a dynamically int8-quantized ONNX export through ONNX Runtime.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", str(min(4, os.cpu_count() or 1))))
+ONNX_MAX_LENGTH = 256
+
+
+def model_id(model_name, backend=EMBEDDING_BACKEND):
+    # Identifies the vectors a backend produces. Cached embeddings and stored
+    # scores are keyed by this, so switching backend never mixes int8 and
+    # full-precision vectors; the torch id is the bare model name so existing
+    # caches stay valid.
+    return model_name if backend == "torch" else f"{model_name}+{backend}-int8"
+
+
+class TorchBackend:
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, batch_size=32):
+        return self.model.encode(texts, batch_size=batch_size)
+
+
+class OnnxBackend:
+    # all-MiniLM-L6-v2 is BERT + mean pooling + L2 normalisation; the
+    # transformer runs in ONNX Runtime and pooling is done here in numpy.
+    # The first load exports the model with torch and quantizes its weights
+    # to int8 under the cache directory; later loads need only onnxruntime
+    # and the tokenizer.
+
+    def __init__(self, model_name, threads=EMBEDDING_THREADS, max_length=ONNX_MAX_LENGTH):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.tokenizer = AutoTokenizer.from_pretrained(hub_name)
+        self.max_length = max_length
+
+        path = cache_path("onnx", model_name.replace("/", "__"), "model.int8.onnx")
+        if not os.path.exists(path):
+            export_quantized(hub_name, path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        # Length-sorted batches keep padding (and so wasted compute) small.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in idx], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            feed = {k: v.astype(np.int64) for k, v in tokens.items() if k in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            out[idx] = pooled / np.maximum(norms, 1e-12)
+        return out[0] if single else out
+
+
+def export_quantized(hub_name, path):
+    # One-off: export the transformer to ONNX, then dynamic int8 quantization
+    # of its weights (activations stay float and are quantized per batch).
+    import torch
+    from transformers import AutoModel
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    model = AutoModel.from_pretrained(hub_name).eval()
+    float_path = path.replace(".int8.onnx", ".f32.onnx")
+    dummy = {
+        "input_ids": torch.ones(1, 8, dtype=torch.long),
+        "attention_mask": torch.ones(1, 8, dtype=torch.long),
+        "token_type_ids": torch.zeros(1, 8, dtype=torch.long),
+    }
+    dynamic = {"batch": 0, "sequence": 1}
+    torch.onnx.export(
+        model, (dummy,), float_path,
+        input_names=list(dummy), output_names=["last_hidden_state"],
+        dynamic_axes={**{k: dynamic for k in dummy}, "last_hidden_state": dynamic},
+        opset_version=14
+    )
+    tmp = path + ".tmp"
+    quantize_dynamic(float_path, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, path)
+    os.remove(float_path)
+
+
+BACKENDS = {"torch": TorchBackend, "onnx": OnnxBackend}
+
+
+def load_backend(model_name, backend=EMBEDDING_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](model_name)
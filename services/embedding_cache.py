@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.cache import cache_path, content_hash, file_lock
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def embedding_key(model_name, text):
+    return content_hash(model_name, normalize_text(text))
+
+
+class EmbeddingStore:
+    # Fixed-capacity float32 matrix on disk (memory-mapped) plus a SQLite
+    # index mapping key -> (slot, last_used). In memory the index is an
+    # OrderedDict in recency order, so a hit or an eviction is O(1); only the
+    # rows that changed are written back. When full, the least recently used
+    # slot is overwritten.
+    #
+    # Several processes (the app and the CLI) may share a store: slot
+    # assignment runs under a file lock, and a generation counter bumped by
+    # every write tells a process to reload the index before trusting a slot.
+
+    def __init__(self, directory, dim, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.vectors_path = cache_path(directory, "vectors.f32")
+        self.lock_path = cache_path(directory, "lock")
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.clock = 0
+        self.generation = None
+        self.touched = set()
+        self.conn = sqlite3.connect(cache_path(directory, "index.sqlite3"), check_same_thread=False)
+        with file_lock(self.lock_path):
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " slot INTEGER NOT NULL UNIQUE,"
+                " last_used INTEGER NOT NULL)"
+            )
+            self.conn.commit()
+            self.vectors = self._open()
+            self._reload()
+
+    def _meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _open(self):
+        expected_size = self.max_entries * self.dim * 4
+        valid = (
+            self._meta("dim") == self.dim
+            and self._meta("max_entries") == self.max_entries
+            and os.path.exists(self.vectors_path)
+            and os.path.getsize(self.vectors_path) == expected_size
+        )
+        mode = "r+"
+        if not valid:
+            mode = "w+"
+            self.conn.execute("DELETE FROM entries")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [("dim", self.dim), ("max_entries", self.max_entries), ("generation", 0)]
+            )
+            self.conn.commit()
+
+        return np.memmap(
+            self.vectors_path, dtype=np.float32, mode=mode,
+            shape=(self.max_entries, self.dim)
+        )
+
+    def _reload(self):
+        # Full read of the index; only needed at start and after another
+        # process has written.
+        rows = self.conn.execute("SELECT key, slot, last_used FROM entries ORDER BY last_used").fetchall()
+        self.entries = OrderedDict((key, slot) for key, slot, _ in rows)
+        self.clock = rows[-1][2] if rows else 0
+        self.generation = self._meta("generation")
+        self.touched.clear()
+
+    def _sync(self):
+        if self._meta("generation") != self.generation:
+            self._reload()
+
+    def _flush_touched(self):
+        if not self.touched:
+            return
+        rows = []
+        for key in self.touched:
+            if key in self.entries:
+                self.clock += 1
+                rows.append((self.clock, key))
+        self.conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", rows)
+        self.touched.clear()
+
+    def get_many(self, keys):
+        # The shared lock keeps another process from reusing a slot between
+        # the generation check and the read.
+        with self.lock, file_lock(self.lock_path, shared=True):
+            self._sync()
+            found = []
+            for key in keys:
+                slot = self.entries.get(key)
+                if slot is None:
+                    found.append(None)
+                    continue
+                self.entries.move_to_end(key)
+                self.touched.add(key)
+                found.append(np.array(self.vectors[slot]))
+            return found
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def put_many(self, keys, vectors):
+        with self.lock, file_lock(self.lock_path):
+            self._sync()
+            # Recency from reads since the last write is persisted with it.
+            self._flush_touched()
+            evicted, rows = [], []
+            for key, vector in zip(keys, vectors):
+                if key in self.entries:
+                    slot = self.entries[key]
+                    self.entries.move_to_end(key)
+                elif len(self.entries) < self.max_entries:
+                    # Slots are only ever reused on eviction, so until the
+                    # store is full the occupied slots are 0..len(entries)-1.
+                    slot = len(self.entries)
+                else:
+                    lru_key, slot = self.entries.popitem(last=False)
+                    evicted.append((lru_key,))
+                self.entries[key] = slot
+                self.vectors[slot] = np.asarray(vector, dtype=np.float32)
+                self.clock += 1
+                rows.append((key, slot, self.clock))
+            self.vectors.flush()
+
+            self.generation += 1
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)", rows
+            )
+            self.conn.execute("UPDATE meta SET value = ? WHERE name = 'generation'", (self.generation,))
+            self.conn.commit()
+
+    def put(self, key, vector):
+        self.put_many([key], [vector])
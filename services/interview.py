@@ -1,14 +1,27 @@
-from services.llm import generate_text
+from services.llm import generate_text, generate_text_stream
 
-def generate_questions(jd_summary, resume_summary):
-    prompt = (
+def questions_prompt(jd_summary, resume_summary):
+    return (
         "You are a senior technical interviewer.\n\n"
         f"Job Description:\n{jd_summary}\n\n"
         f"Candidate Profile:\n{resume_summary}\n\n"
         "Generate 5 targeted interview questions. "
         "Mix technical and behavioral. Keep each question concise."
     )
-    return generate_text(prompt)
+
+def generate_questions(jd_summary, resume_summary):
+    return generate_text(questions_prompt(jd_summary, resume_summary))
+
+def prefetch_questions(jd_summary, resume_summary):
+    # For background jobs: generate_text reports API errors and returns "",
+    # which must not pass for a finished job, so an empty result raises.
+    text, latency = generate_questions(jd_summary, resume_summary)
+    if not text:
+        raise RuntimeError("LLM returned no interview questions")
+    return text, latency
+
+def stream_questions(jd_summary, resume_summary):
+    return generate_text_stream(questions_prompt(jd_summary, resume_summary))
 
 def generate_summary(jd_summary, resume_summary):
     prompt = (
@@ -1,26 +1,329 @@
 import os
+import sys
 import time
-import streamlit as st
-from openai import OpenAI
+import logging
+import queue
+import random
+import asyncio
+import threading
+from services.llm_cache import ResponseCache, response_key
+from utils.instrument import count, current_run, use_run
 
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
-)
+logger = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
 
 MODEL = "llama-3.1-8b-instant"
 
-def generate_text(prompt, temperature=0.4, max_tokens=800):
-    try:
-        start = time.time()
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-            max_tokens=max_tokens
+# Defaults follow Groq's free-tier limits for llama-3.1-8b-instant.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "6000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = 1.0
+LLM_BACKOFF_MAX = 30.0
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    # Refills continuously at rate_per_minute up to `capacity`. consume() may
+    # drive the balance negative to account for usage only known afterwards
+    # (completion tokens); later acquires then wait off the debt.
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.capacity = capacity or rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+
+def _is_retryable(error):
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_delay(error, attempt):
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    delay = min(LLM_BACKOFF_BASE * 2 ** attempt, LLM_BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 2)
+
+
+class AsyncLLMClient:
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=BASE_URL,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+        max_retries=LLM_MAX_RETRIES,
+    ):
+        from openai import AsyncOpenAI
+        # One AsyncOpenAI (and so one pooled HTTP connection set) per client.
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("GROQ_API_KEY"),
+            base_url=base_url,
+            max_retries=0
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+
+    async def generate(self, prompt, temperature=0.4, max_tokens=800):
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.requests.acquire()
+                await self.tokens.acquire(estimate_tokens(prompt))
+                try:
+                    start = time.time()
+                    response = await self.client.chat.completions.create(
+                        model=MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    latency = round(time.time() - start, 2)
+                    current_run().record("llm", latency)
+                    count("llm_calls")
+                    if response.usage is not None:
+                        self.tokens.consume(response.usage.completion_tokens)
+                        count("llm_prompt_tokens", response.usage.prompt_tokens)
+                        count("llm_completion_tokens", response.usage.completion_tokens)
+                    return response.choices[0].message.content, latency
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        count("llm_errors")
+                        raise
+                    count("llm_retries")
+                    await asyncio.sleep(_retry_delay(e, attempt))
+
+    async def stream(self, prompt, on_chunk, temperature=0.4, max_tokens=800):
+        # Calls on_chunk(text) per delta. Retries are only possible until the
+        # first delta has been delivered.
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.requests.acquire()
+                await self.tokens.acquire(estimate_tokens(prompt))
+                delivered = 0
+                try:
+                    start = time.time()
+                    response = await self.client.chat.completions.create(
+                        model=MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True
+                    )
+                    async for chunk in response:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            delivered += len(delta)
+                            on_chunk(delta)
+                    self.tokens.consume(delivered // 4)
+                    # Streams carry no usage block; token counts are estimates.
+                    current_run().record("llm", time.time() - start)
+                    count("llm_calls")
+                    count("llm_prompt_tokens", estimate_tokens(prompt))
+                    count("llm_completion_tokens", delivered // 4)
+                    return
+                except Exception as e:
+                    if delivered or attempt == self.max_retries or not _is_retryable(e):
+                        count("llm_errors")
+                        raise
+                    count("llm_retries")
+                    await asyncio.sleep(_retry_delay(e, attempt))
+
+    async def generate_many(self, prompts, temperature=0.4, max_tokens=800):
+        return await asyncio.gather(
+            *(self.generate(p, temperature, max_tokens) for p in prompts),
+            return_exceptions=True
         )
-        latency = round(time.time() - start, 2)
-        return response.choices[0].message.content, latency
+
+
+# All async work runs on one long-lived event loop in a daemon thread, so the
+# client, its connection pool and its rate-limit state are shared by every
+# Streamlit script run in the process.
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
+
+
+def _submit(make_coro):
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+
+    # The loop thread has its own context: the caller's metrics run is
+    # re-entered inside the task, and gathered subtasks inherit it.
+    run = current_run()
+
+    async def runner():
+        global _client
+        if _client is None:
+            _client = AsyncLLMClient()
+        with use_run(run):
+            return await make_coro(_client)
+
+    return asyncio.run_coroutine_threadsafe(runner(), _loop)
+
+
+def _run(make_coro):
+    return _submit(make_coro).result()
+
+
+response_cache = ResponseCache()
+
+
+def _report_error(error):
+    # Always logged, so CLI runs and background threads leave a trace; also
+    # shown in the page when called from a Streamlit script thread. Streamlit
+    # is only consulted if the app already imported it.
+    logger.error("LLM API error: %s", error)
+    if "streamlit" not in sys.modules:
+        return
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        import streamlit as st
+        st.error(f"LLM API error: {error}")
+
+
+def warmup():
+    # Starts the event loop thread and builds the client without a request.
+    _run(lambda client: asyncio.sleep(0))
+
+
+def generate_many(prompts, temperature=0.4, max_tokens=800, cache=True):
+    # Pass cache=False where a fresh (non-deterministic) completion is wanted.
+    prompts = list(prompts)
+    if not prompts:
+        return []
+
+    outputs = [None] * len(prompts)
+    keys = [response_key(MODEL, p, temperature, max_tokens) for p in prompts]
+    if cache:
+        for i, key in enumerate(keys):
+            cached = response_cache.get(key)
+            if cached is not None:
+                outputs[i] = (cached, 0.0)
+
+    misses = [i for i, output in enumerate(outputs) if output is None]
+    if misses:
+        results = _run(lambda client: client.generate_many(
+            [prompts[i] for i in misses], temperature, max_tokens
+        ))
+        for i, result in zip(misses, results):
+            if isinstance(result, Exception):
+                _report_error(result)
+                outputs[i] = ("", 0.0)
+                continue
+            outputs[i] = result
+            if cache and result[0]:
+                response_cache.put(keys[i], result[0])
+    return outputs
+
+
+def generate_text(prompt, temperature=0.4, max_tokens=800, cache=True):
+    key = response_key(MODEL, prompt, temperature, max_tokens)
+    if cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached, 0.0
+    try:
+        text, latency = _run(lambda client: client.generate(prompt, temperature, max_tokens))
     except Exception as e:
-        st.error(f"LLM API error: {e}")
+        _report_error(e)
         return "", 0.0
+    if cache and text:
+        response_cache.put(key, text)
+    return text, latency
+
+
+class TextStream:
+    # Iterating yields completion text as it arrives; afterwards `text` holds
+    # the full completion and `ttft` / `latency` the time to first token and
+    # total time in seconds (both 0.0 for a cache hit).
+
+    def __init__(self, prompt, temperature=0.4, max_tokens=800, cache=True):
+        self.prompt = prompt
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.cache = cache
+        self.text = ""
+        self.ttft = None
+        self.latency = None
+
+    def __iter__(self):
+        key = response_key(MODEL, self.prompt, self.temperature, self.max_tokens)
+        if self.cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                self.text, self.ttft, self.latency = cached, 0.0, 0.0
+                yield cached
+                return
+
+        chunks = queue.Queue()
+
+        async def produce(client):
+            try:
+                await client.stream(self.prompt, chunks.put, self.temperature, self.max_tokens)
+            finally:
+                chunks.put(None)
+
+        start = time.time()
+        future = _submit(produce)
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            if self.ttft is None:
+                self.ttft = round(time.time() - start, 2)
+            self.text += chunk
+            yield chunk
+        self.latency = round(time.time() - start, 2)
+
+        try:
+            future.result()
+        except Exception as e:
+            _report_error(e)
+            return
+        if self.cache and self.text:
+            response_cache.put(key, self.text)
+
+
+def generate_text_stream(prompt, temperature=0.4, max_tokens=800, cache=True):
+    return TextStream(prompt, temperature, max_tokens, cache)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from services.parser import parse_jd
+from services.ranking import COMPONENTS, weight_vector, top_indices
+from services.scorer import embed_many, semantic_matrix
+from utils.instrument import timed
+
+
+def skill_bit_matrix(skill_lists, vocabulary):
+    # One row per skill list, one boolean column per vocabulary skill; skills
+    # outside the vocabulary are dropped.
+    bits = np.zeros((len(skill_lists), len(vocabulary)), dtype=bool)
+    for i, skills in enumerate(skill_lists):
+        bits[i, [vocabulary[s] for s in skills if s in vocabulary]] = True
+    return bits
+
+
+def component_tensor(jd_structs, resume_structs, semantic):
+    # (resumes, JDs, COMPONENTS) with the same definitions as
+    # scorer.component_scores. Skill overlap for every pair is one product of
+    # candidate-by-skill and JD-by-skill bit matrices over the JD vocabulary
+    # (resume skills no JD asks for cannot affect any component).
+    vocabulary = {s: i for i, s in enumerate(sorted({s for jd in jd_structs for s in jd["skills"]}))}
+    jd_bits = skill_bit_matrix([jd["skills"] for jd in jd_structs], vocabulary).astype(np.float32)
+    resume_bits = skill_bit_matrix([r["skills"] for r in resume_structs], vocabulary).astype(np.float32)
+
+    matched = resume_bits @ jd_bits.T
+    required = jd_bits.sum(axis=1)
+    has_skills = required > 0
+    per_skill = 1 / np.where(has_skills, required, 1)
+    skill = np.where(has_skills, matched * per_skill, 0)
+    gap = np.where(has_skills, 1 - ((required - matched) * per_skill) ** 2, 0)
+
+    years = np.array([r.get("years_experience") or 0 for r in resume_structs], dtype=np.float64)
+    years_required = np.array([jd.get("years_required") or 0 for jd in jd_structs], dtype=np.float64)
+    experience = np.where(
+        years_required > 0,
+        np.minimum(years[:, None] / np.where(years_required > 0, years_required, 1), 1),
+        0
+    )
+
+    # Rounded like build_breakdown, so a column equals a single-JD screening.
+    return np.round(np.stack([skill, experience, semantic, gap], axis=-1).astype(np.float64), 3)
+
+
+class MultiJDResults:
+    # One resume pool scored against many JDs: `tensor` is (resumes, JDs,
+    # COMPONENTS), so any weighting gives the full resumes x JDs score matrix
+    # in one product.
+
+    def __init__(self, titles, jd_structs, keys, candidates, resumes, tensor):
+        self.titles = list(titles)
+        self.jd_structs = list(jd_structs)
+        self.keys = list(keys)
+        self.candidates = list(candidates)
+        self.resumes = list(resumes)
+        self.tensor = np.asarray(tensor, dtype=np.float64).reshape(len(self.keys), len(self.titles), len(COMPONENTS))
+
+    def scores(self, weights):
+        return self.tensor @ weight_vector(weights)
+
+    def rank(self, j, weights, top_n=None):
+        scores = self.tensor[:, j] @ weight_vector(weights)
+        order = top_indices(scores, top_n)
+        return order, scores[order]
+
+    def ranking_frame(self, j, weights, top_n=None):
+        order, scores = self.rank(j, weights, top_n)
+        m = self.tensor[order, j]
+        return pd.DataFrame({
+            "Candidate":        [self.candidates[i] for i in order],
+            "Score":            np.round(scores, 3),
+            "Skill Score":      m[:, 0],
+            "Experience Score": m[:, 1],
+            "Semantic Score":   m[:, 2],
+            "Gap Score":        m[:, 3],
+        })
+
+    def matrix_frame(self, weights):
+        return pd.DataFrame(np.round(self.scores(weights), 3), index=self.candidates, columns=self.titles)
+
+    def best_roles(self, weights):
+        # Best and runner-up role per candidate, with the margin between them.
+        scores = self.scores(weights)
+        n, m = scores.shape
+        order = np.argsort(-scores, axis=1, kind="stable")
+        rows = np.arange(n)
+        best = scores[rows, order[:, 0]]
+        frame = pd.DataFrame({
+            "Candidate":  self.candidates,
+            "Best Role":  [self.titles[j] for j in order[:, 0]],
+            "Best Score": np.round(best, 3),
+        })
+        if m > 1:
+            second = scores[rows, order[:, 1]]
+            frame["Runner-up Role"] = [self.titles[j] for j in order[:, 1]]
+            frame["Margin"] = np.round(best - second, 3)
+        return frame.sort_values("Best Score", ascending=False).reset_index(drop=True)
+
+
+def screen_many(jds, keys, candidates, resume_structs):
+    # jds: [(title, text)]. Each JD is parsed once and all JD summaries are
+    # embedded in one batch; the pool is embedded once for every JD.
+    with timed("multi_jd", items=len(resume_structs) * len(jds)):
+        jd_structs = [parse_jd(text) for _, text in jds]
+        jd_embeddings = embed_many([jd["summary"] for jd in jd_structs])
+        semantic = semantic_matrix(resume_structs, jd_embeddings)
+        tensor = component_tensor(jd_structs, resume_structs, semantic)
+    return MultiJDResults([title for title, _ in jds], jd_structs, keys, candidates, resume_structs, tensor)
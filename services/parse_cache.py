@@ -0,0 +1,63 @@
+import json
+import time
+import sqlite3
+import threading
+from utils.cache import cache_path
+
+
+class ParseCache:
+    # Parsed resume structs keyed by the SHA-256 of the uploaded bytes. Each
+    # row carries the parser version it was produced with; rows from any other
+    # version are treated as misses and overwritten on the next put.
+
+    def __init__(self, filename="parse_cache.sqlite3"):
+        self.path = cache_path(filename)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            " file_hash TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " struct TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, file_hashes, version):
+        if not file_hashes:
+            return []
+        found = {}
+        with self.lock:
+            unique = list(dict.fromkeys(file_hashes))
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT file_hash, struct FROM parsed "
+                    f"WHERE version = ? AND file_hash IN ({placeholders})",
+                    [version, *chunk]
+                ).fetchall()
+                found.update((h, json.loads(s)) for h, s in rows)
+        return [found.get(h) for h in file_hashes]
+
+    def get(self, file_hash, version):
+        return self.get_many([file_hash], version)[0]
+
+    def put_many(self, file_hashes, version, structs):
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO parsed (file_hash, version, struct, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(h, version, json.dumps(s), now) for h, s in zip(file_hashes, structs)]
+            )
+            self.conn.commit()
+
+    def put(self, file_hash, version, struct):
+        self.put_many([file_hash], version, [struct])
+
+    def purge_stale(self, version):
+        with self.lock:
+            self.conn.execute("DELETE FROM parsed WHERE version != ?", (version,))
+            self.conn.commit()
@@ -1,11 +1,41 @@
 import re
-import spacy
 from datetime import datetime
-from services.llm import generate_text
+from services.llm import generate_text, generate_many
+from services.parse_cache import ParseCache
+from services.skills import skill_matcher
+from utils.cache import content_hash
+from utils.instrument import timed, count
+from utils.lazy import LazySingleton
+from utils.text import SECTION_HEADER_RE
+
+
+# Name extraction only reads doc.ents; en_core_web_sm's ner has its own
+# embedding layer, so everything else can be left out of the pipeline.
+NER_EXCLUDE = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+NER_BATCH_SIZE = 64
+NER_N_PROCESS = 1
+
+
+def _load_nlp():
+    import spacy
+    return spacy.load("en_core_web_sm", exclude=NER_EXCLUDE)
+
+
+_nlp = LazySingleton(_load_nlp)
+
+
+def get_nlp():
+    return _nlp.get()
 
-nlp = spacy.load("en_core_web_sm")
 
 CURRENT_YEAR = datetime.now().year
+CURRENT_MONTH = datetime.now().month
+
+# Bump whenever a change here alters what parse_resume returns, so cached
+# structs produced by the old code are no longer served.
+PARSER_VERSION = "5"
+
+parse_cache = ParseCache()
 
 COMMON_HEADERS = {
     "resume", "curriculum vitae", "life philosophy",
@@ -61,120 +91,301 @@ def is_valid_name(name):
     return True
 
 
+def name_llm_prompt(text):
+    return (
+        "You are extracting a person's full name from a resume. "
+        "The name is typically at the very top of the document. "
+        "It may be a Western, Indian, Asian, or other non-English name. "
+        "Return ONLY the full name as it appears, nothing else — "
+        "no job titles, no skills, no location. "
+        "If you cannot confidently identify a name, return NULL.\n\n"
+        f"{text[:1500]}"
+    )
+
+
+def parse_name_llm(result):
+    result = result.strip().strip('"').strip("'").split("\n")[0]
+    if result and result.upper() != "NULL":
+        return result
+    return None
+
+
 def extract_name_llm(text):
     try:
-        prompt = (
-            "You are extracting a person's full name from a resume. "
-            "The name is typically at the very top of the document. "
-            "It may be a Western, Indian, Asian, or other non-English name. "
-            "Return ONLY the full name as it appears, nothing else — "
-            "no job titles, no skills, no location. "
-            "If you cannot confidently identify a name, return NULL.\n\n"
-            f"{text[:1500]}"
-        )
-        result, _ = generate_text(prompt)
-        result = result.strip().strip('"').strip("'").split("\n")[0]
-        if result and result.upper() != "NULL":
-            return result
+        result, _ = generate_text(name_llm_prompt(text))
+        return parse_name_llm(result)
     except:
         pass
     return None
 
 
-def extract_name(text, filename=None):
-    doc = nlp(text[:2000])
-    for ent in doc.ents:
-        if ent.label_ == "PERSON":
-            candidate = ent.text.strip().title()
-            if is_valid_name(candidate):
-                return candidate
-
+def extract_name_heuristic(text):
     lines = [l.strip() for l in text.split("\n") if l.strip()]
     for line in lines[:6]:
         if line.isupper():
             line = line.title()
         if is_valid_name(line):
             return line
+    return None
+
 
+def extract_name_ner(doc):
+    for ent in doc.ents:
+        if ent.label_ == "PERSON":
+            candidate = ent.text.strip().title()
+            if is_valid_name(candidate):
+                return candidate
+    return None
+
+
+def extract_name_filename(filename):
     if filename:
         name_part = re.sub(r"\.(pdf|docx|txt|doc)$", "", filename, flags=re.IGNORECASE)
         clean = re.sub(r"[_\-\.]", " ", name_part)
         clean = re.sub(r"\s+", " ", clean).strip().title()
         if is_valid_name(clean):
             return clean
+    return None
 
-    return extract_name_llm(text)
+
+def extract_names(texts, filenames=None, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS, failed=None):
+    # Cheapest first: line heuristics, then NER over only the texts they
+    # missed (one nlp.pipe call), then the filename, then one concurrent
+    # batch of LLM calls for whatever is left. Indices whose LLM call came
+    # back empty (an API error) are added to `failed` when given.
+    filenames = filenames or [None] * len(texts)
+    names = [extract_name_heuristic(text) for text in texts]
+
+    pending = [i for i, name in enumerate(names) if not name]
+    if pending:
+        with timed("ner", items=len(pending)):
+            docs = get_nlp().pipe(
+                (texts[i][:2000] for i in pending),
+                batch_size=batch_size,
+                n_process=n_process
+            )
+            for i, doc in zip(pending, docs):
+                names[i] = extract_name_ner(doc)
+
+    pending = []
+    for i, name in enumerate(names):
+        if not name:
+            names[i] = extract_name_filename(filenames[i])
+            if not names[i]:
+                pending.append(i)
+
+    if pending:
+        count("name_llm_fallbacks", len(pending))
+        results = generate_many([name_llm_prompt(texts[i]) for i in pending])
+        for i, (result, _) in zip(pending, results):
+            names[i] = parse_name_llm(result)
+            if not result and failed is not None:
+                failed.add(i)
+    return names
+
+
+def extract_name(text, filename=None):
+    return extract_names([text], [filename], n_process=1)[0]
+
+
+YEARS_CLAIM_RE = re.compile(r"(\d+)\+?\s+years?", re.IGNORECASE)
 
 
 def extract_years_regex(text):
-    matches = re.findall(r"(\d+)\+?\s+years?", text.lower())
+    matches = YEARS_CLAIM_RE.findall(text)
     if matches:
         return max([int(m) for m in matches])
     return None
 
 
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+)}
+_MONTH_NAME = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+)
+
+
+def _date(tag):
+    # "Jan 2019", "January, 2019", "03/2019", "3-2019", "2019".
+    return (
+        rf"(?:(?P<{tag}_name>{_MONTH_NAME})\s*,?\s*|(?P<{tag}_num>0?[1-9]|1[0-2])\s*[/.-]\s*)?"
+        rf"(?P<{tag}_year>(?:19|20)\d{{2}})"
+    )
+
+
+# Every employment date range in one compiled pattern, so a resume is scanned
+# once: "Jan 2019 – Present", "03/2017-06/2020", "2015 to 2018".
+DATE_RANGE_RE = re.compile(
+    rf"\b{_date('start')}\s*(?:-|–|—|to|until|till|through)\s*"
+    rf"(?:{_date('end')}|(?P<present>present|current|now|today|date))\b",
+    re.IGNORECASE
+)
+
+# Ranges in these sections, or on lines naming a degree or school, are study
+# rather than employment.
+NON_EMPLOYMENT_SECTIONS = {"education", "certifications", "publications", "awards", "achievements"}
+EDUCATION_LINE_RE = re.compile(
+    r"\b(?:university|college|bachelor'?s?|masters?\s+of|master'?s|b\.?\s?sc|m\.?\s?sc|"
+    r"b\.?\s?tech|m\.?\s?tech|mba|ph\.?\s?d|diploma|gpa|graduated?)\b",
+    re.IGNORECASE
+)
+
+
+YEAR_RE = re.compile(r"(?:19|20)\d\d")
+
+
+def employment_text(text):
+    # Only lines holding a year can hold a range, so the range pattern runs
+    # on a few dated lines rather than the whole resume.
+    lines, skipping = [], False
+    for line in text.splitlines():
+        if SECTION_HEADER_RE.match(line):
+            skipping = line.strip().rstrip(":").strip().lower() in NON_EMPLOYMENT_SECTIONS
+        elif not skipping and YEAR_RE.search(line) and not EDUCATION_LINE_RE.search(line):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _month_index(name, num, year):
+    # Months since year 0; a bare year means January.
+    month = MONTHS[name[:3].lower()] if name else int(num) if num else 1
+    return int(year) * 12 + month - 1
+
+
+def employment_intervals(text):
+    # Half-open [start, end) month intervals. An end with a month includes
+    # that month ("Jan 2019 - Mar 2019" is 3 months); a bare end year does not,
+    # so "2015 to 2018" is 3 years. Future and pre-1970 dates are dropped.
+    now = CURRENT_YEAR * 12 + CURRENT_MONTH
+    intervals = []
+    for m in DATE_RANGE_RE.finditer(employment_text(text)):
+        start = _month_index(m["start_name"], m["start_num"], m["start_year"])
+        if m["present"]:
+            end = now
+        else:
+            end = _month_index(m["end_name"], m["end_num"], m["end_year"])
+            if m["end_name"] or m["end_num"]:
+                end += 1
+        end = min(end, now)
+        if 1970 * 12 <= start < end:
+            intervals.append((start, end))
+    return intervals
+
+
+def merged_months(intervals):
+    # Total months covered, counting overlapping or concurrent roles once.
+    total, current = 0, None
+    for start, end in sorted(intervals):
+        if current and start <= current[1]:
+            current[1] = max(current[1], end)
+            continue
+        if current:
+            total += current[1] - current[0]
+        current = [start, end]
+    if current:
+        total += current[1] - current[0]
+    return total
+
+
 def extract_years_from_dates(text):
-    years = re.findall(r"(19\d{2}|20\d{2})", text)
-    years = [int(y) for y in years if 1970 < int(y) <= CURRENT_YEAR]
-    if len(years) >= 2:
-        return max(years) - min(years)
+    months = merged_months(employment_intervals(text))
+    if months:
+        return round(months / 12, 1)
     return None
 
 
-def extract_years_llm(text):
-    try:
-        prompt = f"""
+def years_llm_prompt(text):
+    return f"""
         Extract total years of professional work experience from this resume.
         Return only an integer.
 
         {text[:2000]}
         """
-        result, _ = generate_text(prompt)
-        result = re.findall(r"\d+", result)
-        if result:
-            return int(result[0])
+
+
+def parse_years_llm(result):
+    result = re.findall(r"\d+", result)
+    if result:
+        return int(result[0])
+    return None
+
+
+def extract_years_llm(text):
+    try:
+        result, _ = generate_text(years_llm_prompt(text))
+        return parse_years_llm(result)
     except:
         pass
     return None
 
 
-def extract_years_experience(text):
+def extract_years_deterministic(text):
     years = extract_years_regex(text)
     if years:
         return years
-    years = extract_years_from_dates(text)
-    if years:
-        return years
-    years = extract_years_llm(text)
-    if years:
-        return years
-    return 0
+    return extract_years_from_dates(text)
 
 
-SKILL_KEYWORDS = [
-    "python", "sql", "java", "aws", "docker",
-    "kubernetes", "excel", "tableau",
-    "machine learning", "deep learning",
-    "project management", "react", "node"
-]
+def extract_years_many(texts, failed=None):
+    # Strategy hit counters (years_regex, years_date_ranges,
+    # years_llm_fallbacks out of years_parsed) show how often the LLM is needed.
+    # `failed` collects indices as in extract_names.
+    with timed("years", items=len(texts)):
+        claimed = [extract_years_regex(text) for text in texts]
+        years = [y or extract_years_from_dates(text) for y, text in zip(claimed, texts)]
+    count("years_parsed", len(texts))
+    count("years_regex", sum(1 for y in claimed if y))
+    count("years_date_ranges", sum(1 for c, y in zip(claimed, years) if y and not c))
+    pending = [i for i, y in enumerate(years) if not y]
+    if pending:
+        count("years_llm_fallbacks", len(pending))
+        results = generate_many([years_llm_prompt(texts[i]) for i in pending])
+        for i, (result, _) in zip(pending, results):
+            years[i] = parse_years_llm(result)
+            if not result and failed is not None:
+                failed.add(i)
+    return [y or 0 for y in years]
 
 
+def extract_years_experience(text):
+    return extract_years_many([text])[0]
+
+
+SKILL_KEYWORDS = skill_matcher.skills
+
+
+@timed("skills")
 def extract_skills(text):
-    text_lower = text.lower()
-    found = []
-    for skill in SKILL_KEYWORDS:
-        if skill in text_lower:
-            found.append(skill)
-    return list(set(found))
+    return skill_matcher.match(text)
+
+
+def parser_version():
+    return content_hash(PARSER_VERSION, skill_matcher.fingerprint)
+
+
+def parse_resumes(texts, filenames=None, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    # "degraded" marks a struct whose LLM fallback failed: it is usable for
+    # this run but must not be cached, so the next run retries the LLM.
+    failed = set()
+    names = extract_names(texts, filenames, batch_size, n_process, failed)
+    years = extract_years_many(texts, failed)
+    return [
+        {
+            "name": name,
+            "years_experience": years_experience,
+            "skills": extract_skills(text),
+            "summary": text[:1000],
+            "text": text,
+            "degraded": i in failed
+        }
+        for i, (text, name, years_experience) in enumerate(zip(texts, names, years))
+    ]
 
 
 def parse_resume(text, filename=None):
-    return {
-        "name": extract_name(text, filename),
-        "years_experience": extract_years_experience(text),
-        "skills": extract_skills(text),
-        "summary": text[:1000]
-    }
+    return parse_resumes([text], [filename], n_process=1)[0]
 
 
 def parse_jd(text):
@@ -0,0 +1,74 @@
+from services import scorer
+from services.parser import parse_resumes, parse_cache, parser_version
+from services.dedup import DEDUP_ENABLED, find_duplicates
+from utils.cache import content_hash
+from utils.instrument import timed, count
+from utils.text import extract_texts
+
+# Parser versions whose stale rows this process has already purged.
+_purged_versions = set()
+
+
+def parse_files(items, dedup_index=None):
+    # items: [(filename, bytes)]. Returns (file_hashes, structs, errors,
+    # duplicate_of), all aligned with items. Cached structs are reused; only
+    # misses are extracted and parsed, and those results are written back to
+    # the cache. A file that fails extraction has struct None and its error
+    # message set. Near-duplicate texts are detected after extraction: only
+    # the first of each cluster is parsed, and the others get struct None and
+    # duplicate_of set to that representative's file hash. Pass a
+    # NearDuplicateIndex seeded with earlier texts to match across batches.
+    items = list(items)
+    version = parser_version()
+    if version not in _purged_versions:
+        # Rows from other parser versions are never served again.
+        parse_cache.purge_stale(version)
+        _purged_versions.add(version)
+    file_hashes = [content_hash(data) for _, data in items]
+    structs = parse_cache.get_many(file_hashes, version)
+    errors = [None] * len(items)
+
+    misses = [i for i, struct in enumerate(structs) if struct is None]
+    count("parse_cache_hits", len(items) - len(misses))
+    count("parse_cache_misses", len(misses))
+    with timed("extract", items=len(misses)):
+        extracted = extract_texts([items[i] for i in misses])
+
+    texts = [struct.get("text") or struct["summary"] if struct else None for struct in structs]
+    for i, (raw, error) in zip(misses, extracted):
+        texts[i] = raw
+        errors[i] = error
+
+    duplicate_of = [None] * len(items)
+    if DEDUP_ENABLED:
+        duplicate_of = find_duplicates(file_hashes, texts, dedup_index)
+        for i, link in enumerate(duplicate_of):
+            if link is not None:
+                structs[i] = None
+
+    to_parse = [
+        (i, texts[i]) for i in misses
+        if texts[i] is not None and duplicate_of[i] is None
+    ]
+    if to_parse:
+        parsed = parse_resumes(
+            [raw for _, raw in to_parse],
+            [items[i][0] for i, _ in to_parse]
+        )
+        for (i, _), struct in zip(to_parse, parsed):
+            structs[i] = struct
+        # Structs whose LLM fallback failed stay out of the cache.
+        keep = [(i, struct) for (i, _), struct in zip(to_parse, parsed) if not struct["degraded"]]
+        count("parse_degraded", len(parsed) - len(keep))
+        parse_cache.put_many([file_hashes[i] for i, _ in keep], version, [struct for _, struct in keep])
+
+    return file_hashes, structs, errors, duplicate_of
+
+
+def screening_fingerprint(jd_text):
+    # Everything a stored score depends on besides the resume itself; results
+    # computed under a different fingerprint must be recomputed.
+    return content_hash(
+        jd_text, parser_version(), scorer.MODEL_ID, scorer.SEMANTIC_MODE,
+        scorer.CHUNK_AGGREGATE, str(scorer.CHUNK_TOP_K)
+    )
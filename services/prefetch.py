@@ -0,0 +1,54 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.instrument import current_run, use_run
+
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+
+class Prefetcher:
+    # Runs fn(*args) for each submitted key on a small thread pool. The pool
+    # is FIFO, so submitting in rank order generates the top candidates
+    # first; a key is only ever submitted once. Jobs record into `run` (the
+    # owning session's Metrics) or else the run active at submit time.
+
+    def __init__(self, fn, workers=PREFETCH_WORKERS, run=None):
+        self.fn = fn
+        self.run = run
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key, *args):
+        with self.lock:
+            if key not in self.futures:
+                self.futures[key] = self.executor.submit(self._call, self.run or current_run(), args)
+
+    def _call(self, run, args):
+        with use_run(run):
+            return self.fn(*args)
+
+    def ready(self, key):
+        future = self.futures.get(key)
+        return future is not None and future.done()
+
+    def result(self, key):
+        # None until the key's job has finished (or if it failed).
+        future = self.futures.get(key)
+        if future is None or not future.done() or future.exception():
+            return None
+        return future.result()
+
+    def failed(self, key):
+        future = self.futures.get(key)
+        return future is not None and future.done() and not future.cancelled() and future.exception() is not None
+
+    def discard(self, key):
+        with self.lock:
+            future = self.futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def progress(self, keys):
+        keys = list(keys)
+        return sum(self.ready(k) for k in keys), len(keys)
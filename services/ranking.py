@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+COMPONENTS = ["skill_score", "experience_score", "semantic_score", "gap_score"]
+WEIGHT_KEYS = ["Skills", "Experience", "Semantic", "Skill Gap"]
+
+
+def weight_vector(weights):
+    return np.array([weights[k] for k in WEIGHT_KEYS], dtype=np.float64)
+
+
+def component_matrix(breakdowns):
+    return np.array(
+        [[b[c] for c in COMPONENTS] for b in breakdowns], dtype=np.float64
+    ).reshape(-1, len(COMPONENTS))
+
+
+def top_indices(scores, top_n=None):
+    # Highest first. argpartition keeps this O(n) for a small top_n; only the
+    # selected rows are sorted.
+    n = len(scores)
+    if top_n is None or top_n >= n:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, top_n - 1)[:top_n]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class ScreeningResults:
+    # Column-wise screening output: one row per candidate in `matrix`
+    # (COMPONENTS order), with names, parsed resumes and content-hash keys
+    # alongside. Re-weighting never touches the per-candidate dicts.
+
+    def __init__(self, keys, candidates, resumes, matrix):
+        self.keys = list(keys)
+        self.candidates = list(candidates)
+        self.resumes = list(resumes)
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(-1, len(COMPONENTS))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def positions(self):
+        return {key: i for i, key in enumerate(self.keys)}
+
+    def subset(self, indices):
+        indices = list(indices)
+        return ScreeningResults(
+            [self.keys[i] for i in indices],
+            [self.candidates[i] for i in indices],
+            [self.resumes[i] for i in indices],
+            self.matrix[indices]
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        parts = [p for p in parts if p is not None]
+        return cls(
+            [k for p in parts for k in p.keys],
+            [c for p in parts for c in p.candidates],
+            [r for p in parts for r in p.resumes],
+            np.concatenate([p.matrix for p in parts]) if parts else np.zeros((0, len(COMPONENTS)))
+        )
+
+    def scores(self, weights):
+        return self.matrix @ weight_vector(weights)
+
+    def rank(self, weights, top_n=None):
+        scores = self.scores(weights)
+        order = top_indices(scores, top_n)
+        return order, scores[order]
+
+    def breakdown(self, i):
+        return {c: round(float(v), 3) for c, v in zip(COMPONENTS, self.matrix[i])}
+
+    def to_frame(self, order, scores):
+        m = self.matrix[order]
+        return pd.DataFrame({
+            "Candidate":        [self.candidates[i] for i in order],
+            "Score":            np.round(scores, 3),
+            "Skill Score":      m[:, 0],
+            "Experience Score": m[:, 1],
+            "Semantic Score":   m[:, 2],
+            "Gap Score":        m[:, 3],
+            "Skills":           [", ".join(self.resumes[i]["skills"]) for i in order],
+            "Years Experience": [self.resumes[i]["years_experience"] for i in order],
+        })
@@ -0,0 +1,149 @@
+import io
+import os
+import json
+import threading
+from collections import OrderedDict
+from utils.cache import content_hash
+from utils.instrument import timed
+
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+
+
+class FragmentCache:
+    # In-process LRU of rendered PDF bytes keyed by content hash. Reports are
+    # cheap to rebuild after a restart, so nothing is written to disk.
+
+    def __init__(self, max_entries=REPORT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self.lock:
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+
+fragment_cache = FragmentCache()
+
+
+def candidate_key(candidate, score, resume, questions, note):
+    # Everything that appears on the candidate's page, and nothing else, so an
+    # edit to one candidate's notes leaves every other fragment cached.
+    return content_hash(json.dumps([
+        "candidate", candidate, round(float(score), 3), resume["skills"],
+        resume["years_experience"], resume["summary"], questions, note or ""
+    ]))
+
+
+def header_key(jd_text):
+    return content_hash(json.dumps(["header", jd_text]))
+
+
+def full_report_key(jd_text, candidate_keys):
+    return content_hash(header_key(jd_text), *candidate_keys)
+
+
+@timed("pdf")
+def _render(elements):
+    from reportlab.platypus import SimpleDocTemplate
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer).build(elements)
+    return buffer.getvalue()
+
+
+def _styles():
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+def candidate_elements(candidate, score, resume, questions, note, styles):
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.units import inch
+    skill_text = ", ".join(resume["skills"]) if resume["skills"] else "None detected"
+    return [
+        Paragraph(f"Candidate: {candidate}", styles["Heading2"]),
+        Spacer(1, 0.2 * inch),
+        Paragraph(f"Score: {round(score, 3)}", styles["Normal"]),
+        Spacer(1, 0.1 * inch),
+        Paragraph(f"Skills: {skill_text}", styles["Normal"]),
+        Paragraph(f"Experience: {resume['years_experience']} years", styles["Normal"]),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Resume Summary:", styles["Heading3"]),
+        Paragraph(resume["summary"], styles["Normal"]),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Interview Questions:", styles["Heading3"]),
+        Paragraph(questions, styles["Normal"]),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Recruiter Notes:", styles["Heading3"]),
+        Paragraph(note or "None", styles["Normal"]),
+        Spacer(1, 0.5 * inch),
+    ]
+
+
+def candidate_pdf(candidate, score, resume, questions, note):
+    key = candidate_key(candidate, score, resume, questions, note)
+    data = fragment_cache.get(key)
+    if data is None:
+        data = _render(candidate_elements(candidate, score, resume, questions, note, _styles()))
+        fragment_cache.put(key, data)
+    return data
+
+
+def header_pdf(jd_text):
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.units import inch
+    key = header_key(jd_text)
+    data = fragment_cache.get(key)
+    if data is None:
+        styles = _styles()
+        data = _render([
+            Paragraph("Full Screening Report", styles["Heading1"]),
+            Spacer(1, 0.3 * inch),
+            Paragraph("Selected Job Description:", styles["Heading2"]),
+            Paragraph(jd_text, styles["Normal"]),
+        ])
+        fragment_cache.put(key, data)
+    return data
+
+
+def full_report_pdf(jd_text, candidates):
+    # candidates: list of (candidate, score, resume, questions, note) in rank
+    # order. The report is the header followed by each candidate's cached
+    # fragment, concatenated page-wise with PyMuPDF, so only fragments whose
+    # content changed are rendered again.
+    keys = [candidate_key(*c) for c in candidates]
+    key = full_report_key(jd_text, keys)
+    data = fragment_cache.get(key)
+    if data is not None:
+        return data
+
+    fragments = [header_pdf(jd_text)] + [candidate_pdf(*c) for c in candidates]
+    with timed("pdf_merge", items=len(fragments)):
+        data = _merge(fragments)
+    fragment_cache.put(key, data)
+    return data
+
+
+def _merge(fragments):
+    import fitz
+    report = fitz.open()
+    for fragment in fragments:
+        with fitz.open(stream=fragment, filetype="pdf") as part:
+            report.insert_pdf(part)
+    data = report.tobytes(garbage=3, deflate=True)
+    report.close()
+    return data
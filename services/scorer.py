@@ -1,13 +1,90 @@
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from services.embedding_cache import EmbeddingStore, embedding_key
+from services.embedding_backends import EMBEDDING_BACKEND, load_backend, model_id
+from utils.lazy import LazySingleton
+from utils.instrument import timed, count
+from utils.text import chunk_text
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_ID = model_id(MODEL_NAME, EMBEDDING_BACKEND)
+EMBEDDING_DIM = 384
+
+def _load_model():
+    # Anything with encode(texts, batch_size) -> float32 array; see
+    # services/embedding_backends.py.
+    return load_backend(MODEL_NAME, EMBEDDING_BACKEND)
+
+# The store is sized from EMBEDDING_DIM rather than the model so that a run
+# served entirely from cache never loads the model.
+_model = LazySingleton(_load_model)
+_embedding_store = LazySingleton(lambda: EmbeddingStore("embeddings", EMBEDDING_DIM))
+
+def get_model():
+    return _model.get()
+
+EMBED_BATCH_SIZE = 32
+
+# "summary" embeds only resume_struct["summary"]; "chunks" embeds the whole
+# resume as section-aligned chunks and aggregates the per-chunk similarities
+# with CHUNK_AGGREGATE ("max" or "topk_mean" over the CHUNK_TOP_K best).
+SEMANTIC_MODE = os.getenv("SEMANTIC_MODE", "chunks")
+CHUNK_AGGREGATE = os.getenv("CHUNK_AGGREGATE", "topk_mean")
+CHUNK_TOP_K = int(os.getenv("CHUNK_TOP_K", "3"))
 
 def embed(text):
-    return model.encode(text)
+    key = embedding_key(MODEL_ID, text)
+    store = _embedding_store.get()
+    cached = store.get(key)
+    if cached is not None:
+        count("embedding_cache_hits")
+        return cached
+    count("embedding_cache_misses")
+    with timed("embed"):
+        vector = np.asarray(get_model().encode(text), dtype=np.float32)
+    store.put(key, vector)
+    return vector
 
-def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
+def embed_many(texts, batch_size=EMBED_BATCH_SIZE, store_misses=True):
+    # store_misses=False serves hits from the cache but leaves newly encoded
+    # vectors out of it: throwaway text (e.g. the bias audit's redacted
+    # counterfactuals) must not evict real resume vectors.
+    texts = list(texts)
+    embeddings = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    if not texts:
+        return embeddings
+
+    store = _embedding_store.get()
+    keys = [embedding_key(MODEL_ID, t) for t in texts]
+    missing = []
+    for i, cached in enumerate(store.get_many(keys)):
+        if cached is None:
+            missing.append(i)
+        else:
+            embeddings[i] = cached
+
+    count("embedding_cache_hits", len(texts) - len(missing))
+    count("embedding_cache_misses", len(missing))
+    if missing:
+        # Duplicate texts within a batch are encoded once.
+        first_text = {}
+        for i in missing:
+            first_text.setdefault(keys[i], texts[i])
+        unique = list(first_text)
+        with timed("embed", items=len(unique)):
+            encoded = np.asarray(
+                get_model().encode([first_text[k] for k in unique], batch_size=batch_size),
+                dtype=np.float32
+            )
+        if store_misses:
+            store.put_many(unique, encoded)
+        by_key = dict(zip(unique, encoded))
+        for i in missing:
+            embeddings[i] = by_key[keys[i]]
+
+    return embeddings
+
+def component_scores(jd_struct, resume_struct):
     jd_skills = set(jd_struct.get("skills", []))
     resume_skills = set(resume_struct.get("skills", []))
 
@@ -24,11 +101,6 @@ def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
         if years_required > 0 else 0
     )
 
-    resume_embedding = embed(resume_struct["summary"])
-    semantic_score = cosine_similarity(
-        [jd_embedding], [resume_embedding]
-    )[0][0]
-
     # Gap score: squared penalty per missing skill — distinct from skill_score
     # skill_score rewards matches; gap_score punishes absences more harshly as gaps grow
     if jd_skills:
@@ -37,6 +109,9 @@ def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
     else:
         gap_score = 0
 
+    return skill_score, experience_score, gap_score
+
+def build_breakdown(skill_score, experience_score, semantic_score, gap_score, weights):
     breakdown = {
         "skill_score": round(float(skill_score), 3),
         "experience_score": round(float(experience_score), 3),
@@ -51,4 +126,81 @@ def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
         weights["Skill Gap"] * breakdown["gap_score"]
     )
 
-    return round(float(total_score), 3), breakdown, resume_embedding
+    return round(float(total_score), 3), breakdown
+
+def resume_chunks(resume_struct):
+    chunks = chunk_text(resume_struct.get("text") or resume_struct["summary"])
+    return chunks or [resume_struct["summary"]]
+
+def aggregate_chunks(similarities, aggregate=CHUNK_AGGREGATE, top_k=CHUNK_TOP_K):
+    # Per-column aggregate over one resume's chunk rows: (chunks,) gives a
+    # scalar, (chunks, JDs) one score per JD.
+    similarities = np.asarray(similarities)
+    if aggregate == "max" or len(similarities) <= 1:
+        return similarities.max(axis=0)
+    k = min(top_k, len(similarities))
+    return np.partition(similarities, -k, axis=0)[-k:].mean(axis=0)
+
+def _unit_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def embed_resumes(resume_structs, batch_size=EMBED_BATCH_SIZE, mode=SEMANTIC_MODE, store_misses=True):
+    # Returns (unit vectors, bounds): rows bounds[i]:bounds[i + 1] belong to
+    # resume i. In chunk mode those are its chunks, all embedded in a single
+    # embed_many call (so chunk vectors are cached like any other text); in
+    # summary mode the one summary vector.
+    if mode != "chunks":
+        texts = [r["summary"] for r in resume_structs]
+        bounds = np.arange(len(texts) + 1)
+    else:
+        chunk_lists = [resume_chunks(r) for r in resume_structs]
+        texts = [c for chunks in chunk_lists for c in chunks]
+        bounds = np.cumsum([0] + [len(c) for c in chunk_lists])
+    return _unit_rows(embed_many(texts, batch_size, store_misses)), bounds
+
+def _semantic(resume_structs, jd_embeddings, batch_size, mode, aggregate, top_k, store_misses):
+    jds = _unit_rows(np.asarray(jd_embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIM))
+    vectors, bounds = embed_resumes(resume_structs, batch_size, mode, store_misses)
+    similarities = vectors @ jds.T
+    scores = np.zeros((len(resume_structs), len(jds)), dtype=np.float32)
+    for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        scores[i] = aggregate_chunks(similarities[start:end], aggregate, top_k)
+    return scores, vectors, bounds
+
+def semantic_matrix(resume_structs, jd_embeddings, batch_size=EMBED_BATCH_SIZE, mode=SEMANTIC_MODE,
+                    aggregate=CHUNK_AGGREGATE, top_k=CHUNK_TOP_K, store_misses=True):
+    # resumes x JDs semantic scores: the resumes (or their chunks) are embedded
+    # once and compared with every JD in one matrix product.
+    return _semantic(resume_structs, jd_embeddings, batch_size, mode, aggregate, top_k, store_misses)[0]
+
+def semantic_scores(resume_structs, jd_embedding, batch_size=EMBED_BATCH_SIZE, mode=SEMANTIC_MODE,
+                    store_misses=True):
+    # Returns (semantic score per resume, one embedding per resume): the
+    # single-JD column of semantic_matrix, plus each resume's normalised mean
+    # chunk vector (its summary vector in summary mode).
+    scores, vectors, bounds = _semantic(
+        resume_structs, jd_embedding, batch_size, mode, CHUNK_AGGREGATE, CHUNK_TOP_K, store_misses
+    )
+    embeddings = _unit_rows(np.add.reduceat(vectors, bounds[:-1], axis=0)) if len(vectors) else vectors
+    return scores[:, 0], embeddings
+
+def score_candidates(jd_struct, resume_structs, jd_embedding, weights, batch_size=EMBED_BATCH_SIZE):
+    # One batched encode for every resume and one matrix-vector product for
+    # all semantic scores; returns the same tuples as score_candidate, in order.
+    with timed("score", items=len(resume_structs)):
+        semantic, embeddings = semantic_scores(resume_structs, jd_embedding, batch_size)
+
+        results = []
+        for resume_struct, semantic_score, resume_embedding in zip(resume_structs, semantic, embeddings):
+            skill_score, experience_score, gap_score = component_scores(jd_struct, resume_struct)
+            total_score, breakdown = build_breakdown(
+                skill_score, experience_score, semantic_score, gap_score, weights
+            )
+            results.append((total_score, breakdown, resume_embedding))
+        return results
+
+def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
+    return score_candidates(jd_struct, [resume_struct], jd_embedding, weights)[0]
@@ -1,11 +1,6 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-def embed(text):
-    return model.encode(text)
+from services.scorer import embed
 
 def score_candidate(jd_struct, resume_struct, jd_embedding, weights):
 
@@ -0,0 +1,72 @@
+import os
+import re
+import json
+from utils.cache import content_hash
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skills.json")
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+
+# Words are lowercase runs of letters/digits that may carry "+"/"#" ("c++",
+# "c#") and inner dots ("node.js"). A leading dot is kept only at the start of
+# a word (".net"), so sentence-ending periods never glue words together.
+TOKEN_RE = re.compile(r"(?:(?<!\S)\.)?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+_END = object()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def load_taxonomy(path=SKILL_TAXONOMY_PATH):
+    # {"canonical skill": ["synonym", ...], ...}
+    with open(path) as f:
+        return json.load(f)
+
+
+class SkillMatcher:
+    # Word-level trie over every canonical name and synonym. Matching walks the
+    # trie from each token and keeps the longest phrase, so one pass over the
+    # text costs O(tokens x longest phrase) regardless of taxonomy size, and
+    # matches always sit on word boundaries ("java" never fires on
+    # "javascript").
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.skills = sorted(taxonomy)
+        self.root = {}
+        for canonical, synonyms in taxonomy.items():
+            for phrase in [canonical, *synonyms]:
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                node = self.root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = canonical
+        self.fingerprint = content_hash(json.dumps(taxonomy, sort_keys=True))
+
+    def match(self, text):
+        tokens = tokenize(text)
+        found = {}
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            longest = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    longest = (node[_END], j)
+            if longest:
+                found.setdefault(longest[0], None)
+                i = longest[1]
+            else:
+                i += 1
+        return list(found)
+
+
+skill_matcher = SkillMatcher(load_taxonomy())
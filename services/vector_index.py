@@ -0,0 +1,360 @@
+import os
+import json
+import threading
+import numpy as np
+from services.scorer import MODEL_ID, SEMANTIC_MODE
+from utils.cache import cache_path, file_lock
+from utils.lazy import LazySingleton
+
+INDEX_NLIST_MAX = 1024
+INDEX_TRAIN_MIN = 2048
+INDEX_NPROBE = int(os.getenv("INDEX_NPROBE", "8"))
+INDEX_KMEANS_ITERS = 10
+INDEX_KMEANS_SAMPLE = 20000
+
+# The vectors an index holds: per-resume embeddings differ by backend (torch
+# vs int8) and by semantic mode (summary vs chunk mean), and must never be
+# ranked against each other.
+EMBEDDING_SPACE = f"{MODEL_ID}:{SEMANTIC_MODE}"
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _kmeans(vectors, k, iters=INDEX_KMEANS_ITERS, seed=0):
+    # Spherical k-means on unit vectors: assign by dot product, re-normalize.
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(k):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class CandidateIndex:
+    # IVF-flat index over resume embeddings, persisted under the cache
+    # directory. Rows are keyed by resume content hash; re-adding a key
+    # replaces it, deleting tombstones the row until the next compaction.
+    # Below INDEX_TRAIN_MIN vectors every query is an exact scan; after that
+    # rows are bucketed under sqrt(n) centroids and a query scans only the
+    # `nprobe` closest buckets. Skill and years filters are applied before
+    # scoring via per-skill posting lists and a years column. An index saved
+    # for another dim or embedding space is ignored and overwritten on save.
+    #
+    # On disk the row arrays are raw files and row metadata is an append-only
+    # JSONL log, so a save writes only the rows that changed since the last
+    # one; state.json is replaced last and records how much of each file is
+    # valid. Saves run under a file lock, and a generation counter tells a
+    # process that another one saved first, in which case it reloads and
+    # re-applies its own unsaved adds and deletes before writing.
+
+    def __init__(self, directory="candidate_index", dim=384, space=EMBEDDING_SPACE):
+        self.directory = directory
+        self.dim = dim
+        self.space = space
+        self.lock = threading.Lock()
+        self.lock_path = self._path("lock")
+        self.pending = []
+        with file_lock(self.lock_path, shared=True):
+            self.load()
+
+    def _path(self, name):
+        return cache_path(self.directory, name)
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def _reset(self):
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.assign = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.years = np.zeros(0, dtype=np.float32)
+        self.centroids = None
+        self.trained_size = 0
+        self.keys = []
+        self.meta = []
+        self.row_of = {}
+        self.postings = {}
+        self.size = 0
+        self.generation = 0
+        self.meta_bytes = 0
+        self.meta_records = 0
+        self.dirty = set()
+        self.meta_dirty = set()
+        self.retrained = False
+        self.rewrite = False
+
+    def _read_state(self):
+        state_path = self._path("state.json")
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path) as f:
+            return json.load(f)
+
+    def load(self):
+        self._reset()
+        state = self._read_state()
+        if state is None or state["dim"] != self.dim or state.get("space") != self.space:
+            # Nothing usable on disk: the first save writes every file.
+            self.rewrite = True
+            if state is not None:
+                self.generation = state["generation"]
+            return
+        n = state["size"]
+        self.generation = state["generation"]
+        self.trained_size = state["trained_size"]
+        self.meta_bytes = state["meta_bytes"]
+        self.meta_records = state["meta_records"]
+        self._grow(n)
+        self.vectors[:n] = np.fromfile(self._path("vectors.f32"), dtype=np.float32, count=n * self.dim).reshape(n, self.dim)
+        self.assign[:n] = np.fromfile(self._path("assign.i32"), dtype=np.int32, count=n)
+        self.alive[:n] = np.fromfile(self._path("alive.u8"), dtype=bool, count=n)
+        self.keys = [None] * n
+        self.meta = [None] * n
+        with open(self._path("meta.jsonl"), "rb") as f:
+            # Later records for a row replace earlier ones.
+            for line in f.read(self.meta_bytes).splitlines():
+                record = json.loads(line)
+                self.keys[record["row"]] = record["key"]
+                self.meta[record["row"]] = record["meta"]
+        self.size = n
+        self.years[:n] = [m["years_experience"] for m in self.meta]
+        if os.path.exists(self._path("centroids.npy")):
+            self.centroids = np.load(self._path("centroids.npy"))
+        self.row_of = {k: i for i, k in enumerate(self.keys) if self.alive[i]}
+        for row in self.row_of.values():
+            for skill in self.meta[row]["skills"]:
+                self.postings.setdefault(skill, set()).add(row)
+
+    def save(self):
+        with self.lock, file_lock(self.lock_path):
+            state = self._read_state()
+            if (state["generation"] if state else 0) != self.generation:
+                pending = self.pending
+                self.load()
+                for op, args in pending:
+                    getattr(self, op)(*args)
+            if self.size and len(self.row_of) < 0.7 * self.size:
+                self._compact()
+            # Replaced rows leave stale records behind in the metadata log.
+            if self.meta_records + len(self.meta_dirty) > 2 * self.size + 1024:
+                self.rewrite = True
+            self._write()
+            self.pending = []
+
+    def _write_rows(self, name, array, rows):
+        path = self._path(name)
+        n = self.size
+        if rows is None or not os.path.exists(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(array[:n].tobytes())
+            os.replace(tmp, path)
+            return
+        row_bytes = array[0].nbytes
+        rows = sorted(rows)
+        with open(path, "r+b") as f:
+            start = 0
+            # Contiguous rows (typically the block appended by one run) are
+            # written with a single call.
+            for i in range(1, len(rows) + 1):
+                if i == len(rows) or rows[i] != rows[i - 1] + 1:
+                    f.seek(rows[start] * row_bytes)
+                    f.write(array[rows[start]:rows[i - 1] + 1].tobytes())
+                    start = i
+
+    def _meta_record(self, row):
+        return (json.dumps({"row": row, "key": self.keys[row], "meta": self.meta[row]}) + "\n").encode()
+
+    def _write(self):
+        rows = None if self.rewrite else self.dirty
+        self._write_rows("vectors.f32", self.vectors, rows)
+        self._write_rows("alive.u8", self.alive, rows)
+        self._write_rows("assign.i32", self.assign, None if self.retrained else rows)
+        if self.rewrite:
+            tmp = self._path("meta.jsonl.tmp")
+            with open(tmp, "wb") as f:
+                self.meta_bytes = f.write(b"".join(self._meta_record(row) for row in range(self.size)))
+            self.meta_records = self.size
+            os.replace(tmp, self._path("meta.jsonl"))
+        elif self.meta_dirty:
+            with open(self._path("meta.jsonl"), "r+b") as f:
+                # Drop anything past the last committed record, e.g. from a
+                # save that died before replacing state.json.
+                f.truncate(self.meta_bytes)
+                f.seek(self.meta_bytes)
+                self.meta_bytes += f.write(b"".join(self._meta_record(row) for row in sorted(self.meta_dirty)))
+            self.meta_records += len(self.meta_dirty)
+        if self.centroids is not None and (self.retrained or self.rewrite):
+            tmp = self._path("centroids.npy.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, self.centroids)
+            os.replace(tmp, self._path("centroids.npy"))
+
+        self.generation += 1
+        tmp = self._path("state.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "space": self.space,
+                "size": self.size,
+                "trained_size": self.trained_size,
+                "meta_bytes": self.meta_bytes,
+                "meta_records": self.meta_records,
+                "generation": self.generation,
+            }, f)
+        os.replace(tmp, self._path("state.json"))
+        self.dirty = set()
+        self.meta_dirty = set()
+        self.retrained = False
+        self.rewrite = False
+
+    def _compact(self):
+        rows = np.flatnonzero(self.alive[:self.size])
+        self.vectors = self.vectors[rows]
+        self.assign = self.assign[rows]
+        self.years = self.years[rows]
+        self.alive = np.ones(len(rows), dtype=bool)
+        self.keys = [self.keys[i] for i in rows]
+        self.meta = [self.meta[i] for i in rows]
+        self.size = len(rows)
+        self.row_of = {k: i for i, k in enumerate(self.keys)}
+        self.postings = {}
+        for row, m in enumerate(self.meta):
+            for skill in m["skills"]:
+                self.postings.setdefault(skill, set()).add(row)
+        self.rewrite = True
+
+    def _grow(self, needed):
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        extra = capacity - len(self.vectors)
+        self.vectors = np.concatenate([self.vectors, np.zeros((extra, self.dim), dtype=np.float32)])
+        self.assign = np.concatenate([self.assign, np.zeros(extra, dtype=np.int32)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        self.years = np.concatenate([self.years, np.zeros(extra, dtype=np.float32)])
+
+    def _unpost(self, row):
+        for skill in self.meta[row]["skills"]:
+            rows = self.postings.get(skill)
+            if rows is not None:
+                rows.discard(row)
+
+    def add(self, keys, vectors, resume_structs):
+        vectors = _normalize(vectors).reshape(-1, self.dim)
+        with self.lock:
+            self.pending.append(("_add", (keys, vectors, resume_structs)))
+            self._add(keys, vectors, resume_structs)
+
+    def _add(self, keys, vectors, resume_structs):
+        for key, vector, resume in zip(keys, vectors, resume_structs):
+            meta = {
+                "name": resume.get("name"),
+                "years_experience": float(resume.get("years_experience") or 0),
+                "skills": sorted(set(resume.get("skills", []))),
+            }
+            row = self.row_of.get(key)
+            if row is None:
+                row = self.size
+                self._grow(row + 1)
+                self.size += 1
+                self.keys.append(key)
+                self.meta.append(meta)
+            else:
+                self._unpost(row)
+                self.meta[row] = meta
+            self.row_of[key] = row
+            self.vectors[row] = vector
+            self.alive[row] = True
+            self.years[row] = meta["years_experience"]
+            self.dirty.add(row)
+            self.meta_dirty.add(row)
+            for skill in meta["skills"]:
+                self.postings.setdefault(skill, set()).add(row)
+            if self.centroids is not None:
+                self.assign[row] = int(np.argmax(self.centroids @ vector))
+
+        alive = len(self.row_of)
+        if alive >= INDEX_TRAIN_MIN and alive >= 4 * max(self.trained_size, INDEX_TRAIN_MIN // 4):
+            self._train()
+
+    def delete(self, keys):
+        with self.lock:
+            self.pending.append(("_delete", (keys,)))
+            self._delete(keys)
+
+    def _delete(self, keys):
+        for key in keys:
+            row = self.row_of.pop(key, None)
+            if row is not None:
+                self.alive[row] = False
+                self.dirty.add(row)
+                self._unpost(row)
+
+    def _train(self):
+        rows = np.flatnonzero(self.alive[:self.size])
+        sample = rows
+        if len(rows) > INDEX_KMEANS_SAMPLE:
+            sample = np.random.default_rng(0).choice(rows, INDEX_KMEANS_SAMPLE, replace=False)
+        nlist = min(INDEX_NLIST_MAX, int(np.sqrt(len(rows))))
+        self.centroids = _kmeans(self.vectors[sample], nlist)
+        n = self.size
+        for start in range(0, n, 8192):
+            block = self.vectors[start:min(n, start + 8192)]
+            self.assign[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        self.trained_size = len(rows)
+        self.retrained = True
+
+    def search(self, query, k=10, nprobe=INDEX_NPROBE, required_skills=None, min_years=None, max_years=None):
+        query = _normalize(query).reshape(self.dim)
+        with self.lock:
+            n = self.size
+            mask = self.alive[:n].copy()
+            if min_years is not None:
+                mask &= self.years[:n] >= min_years
+            if max_years is not None:
+                mask &= self.years[:n] <= max_years
+            for skill in required_skills or []:
+                allowed = np.zeros(n, dtype=bool)
+                allowed[list(self.postings.get(skill, ()))] = True
+                mask &= allowed
+
+            rows = np.flatnonzero(mask)
+            if self.centroids is not None and len(rows) > k:
+                nprobe = min(nprobe, len(self.centroids))
+                probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                probed = rows[np.isin(self.assign[rows], probes)]
+                # A tight filter can leave the probed buckets nearly empty;
+                # fall back to scanning every row that passed the filter.
+                if len(probed) >= k:
+                    rows = probed
+
+            if not len(rows):
+                return []
+            scores = self.vectors[rows] @ query
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            return [
+                {"key": self.keys[rows[i]], "score": float(scores[i]), **self.meta[rows[i]]}
+                for i in best
+            ]
+
+
+_candidate_index = LazySingleton(CandidateIndex)
+
+
+def get_candidate_index():
+    return _candidate_index.get()
@@ -0,0 +1,27 @@
+import threading
+from services import llm
+from services.parser import get_nlp
+from services.scorer import get_model
+
+_started = False
+_lock = threading.Lock()
+
+
+def warmup(nlp=True, embeddings=True, llm_client=True):
+    if nlp:
+        get_nlp()
+    if embeddings:
+        get_model()
+    if llm_client:
+        llm.warmup()
+
+
+def start_background_warmup(**kwargs):
+    # Idempotent per process: Streamlit reruns the script on every
+    # interaction, but only the first call starts a thread.
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=warmup, kwargs=kwargs, daemon=True).start()
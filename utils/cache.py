@@ -0,0 +1,45 @@
+import os
+import hashlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process locking is unavailable
+    fcntl = None
+
+CACHE_DIR = os.getenv(
+    "RESUME_SCREENER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "resume-screener")
+)
+
+
+def cache_path(*parts):
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for i, part in enumerate(parts):
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        if i:
+            digest.update(b"\0")
+        digest.update(part)
+    return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    # Advisory lock on `path` for on-disk caches shared by several processes
+    # (the app and the CLI). Shared locks admit concurrent readers.
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,154 @@
+import io
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import ContextDecorator, contextmanager
+
+# Off, "cprofile" or "pyinstrument"; the app can also turn profiling on per run.
+PROFILE_MODE = os.getenv("PROFILE_MODE", "off")
+
+
+class Metrics:
+    # Stage timings and counters for one run. Recording is a perf_counter
+    # call and a locked dict update, so it is cheap enough to leave on;
+    # start_run() clears the previous run's numbers. Records go to the run
+    # active in the current context (see use_run), or to the process-wide
+    # `metrics` when none is, as in the CLI and benchmarks.
+
+    def __init__(self, label="run"):
+        self.lock = threading.Lock()
+        self.start_run(label)
+
+    def start_run(self, label="run"):
+        with self.lock:
+            self.label = label
+            self.started_at = time.time()
+            self.stages = {}
+            self.counters = {}
+            self.profile = None
+
+    def record(self, stage, seconds, items=1):
+        with self.lock:
+            s = self.stages.setdefault(stage, {"calls": 0, "items": 0, "total_s": 0.0, "max_s": 0.0})
+            s["calls"] += 1
+            s["items"] += items
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self.lock:
+            stages = {
+                name: {
+                    **s,
+                    "total_s": round(s["total_s"], 4),
+                    "max_s": round(s["max_s"], 4),
+                    "mean_ms": round(1000 * s["total_s"] / s["calls"], 3),
+                }
+                for name, s in self.stages.items()
+            }
+            return {
+                "label": self.label,
+                "started_at": self.started_at,
+                "elapsed_s": round(time.time() - self.started_at, 3),
+                "stages": stages,
+                "counters": dict(self.counters),
+                "profile": self.profile,
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+
+metrics = Metrics()
+
+# Each Streamlit session records into its own Metrics, so one user's run
+# never clears or mixes with another's. Threads and event-loop tasks start
+# with an empty context, so work handed to them carries the run explicitly.
+_current_run = contextvars.ContextVar("metrics_run", default=None)
+
+
+def current_run():
+    return _current_run.get() or metrics
+
+
+def activate(run):
+    # For the Streamlit script thread: every record in this script run (and
+    # in the thread's later runs) goes to `run`.
+    _current_run.set(run)
+
+
+@contextmanager
+def use_run(run):
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+class timed(ContextDecorator):
+    # `with timed("embed", items=n):` or `@timed("skills")`. Nested stages are
+    # each recorded in full, so stage totals can overlap.
+
+    def __init__(self, stage, items=1):
+        self.stage = stage
+        self.items = items
+
+    def _recreate_cm(self):
+        # As a decorator one instance serves every call, on any thread; each
+        # call gets its own timer so overlapping calls keep their own start.
+        return timed(self.stage, self.items)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current_run().record(self.stage, time.perf_counter() - self.start, self.items)
+        return False
+
+
+def count(name, n=1):
+    current_run().count(name, n)
+
+
+@contextmanager
+def profiled(mode=PROFILE_MODE):
+    # Profiles the block and stores a text report on the active run's profile.
+    # pyinstrument is optional and only imported when asked for.
+    if mode in (None, "", "off"):
+        yield
+        return
+
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            current_run().profile = profiler.output_text(unicode=True)
+        return
+
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            current_run().profile = out.getvalue()
+        return
+
+    raise ValueError(f"Unknown profile mode: {mode}")
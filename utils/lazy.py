@@ -0,0 +1,23 @@
+import threading
+
+
+class LazySingleton:
+    # Builds the wrapped object on first get() and shares it process-wide.
+    # Double-checked locking keeps concurrent first callers (Streamlit runs
+    # each session in its own thread) from building it twice.
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.instance = None
+
+    @property
+    def loaded(self):
+        return self.instance is not None
+
+    def get(self):
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    self.instance = self.factory()
+        return self.instance
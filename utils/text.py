@@ -1,14 +1,178 @@
 import fitz
 from docx import Document
 import io
+import re
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
 
-def extract_text(file):
-    if file.name.endswith(".pdf"):
-        doc = fitz.open(stream=file.read(), filetype="pdf")
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "30"))
+
+
+def extract_bytes(name, data):
+    if name.endswith(".pdf"):
+        doc = fitz.open(stream=data, filetype="pdf")
         return "".join([page.get_text() for page in doc])
 
-    if file.name.endswith(".docx"):
-        doc = Document(io.BytesIO(file.read()))
+    if name.endswith(".docx"):
+        doc = Document(io.BytesIO(data))
         return "\n".join([p.text for p in doc.paragraphs])
 
-    return file.read().decode("utf-8")
\ No newline at end of file
+    return data.decode("utf-8")
+
+
+def extract_text(file):
+    return extract_bytes(file.name, file.read())
+
+
+def _extract_item(item):
+    name, data = item
+    try:
+        return extract_bytes(name, data), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+# Spawned rather than forked: the app's process runs Streamlit, the LLM event
+# loop and torch threads, none of which survive a fork safely.
+_MP = multiprocessing.get_context("spawn")
+
+
+def _serve(conn):
+    while True:
+        item = conn.recv()
+        if item is None:
+            return
+        conn.send(_extract_item(item))
+
+
+class _Worker:
+
+    def __init__(self):
+        self.conn, child = _MP.Pipe()
+        self.process = _MP.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ExtractPool:
+    # Long-lived extraction processes reused across calls, so a one-file
+    # re-run pays the start-up cost only once per app process. Each file gets
+    # its own deadline from the moment a worker picks it up; a worker that
+    # misses it is killed and replaced, so a hung parser costs that file alone
+    # and never holds up files queued behind it.
+
+    def __init__(self):
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def run(self, items, workers, timeout):
+        results = [None] * len(items)
+        queue = deque(enumerate(items))
+        busy = {}
+        with self.lock:
+            while queue or busy:
+                while queue and len(busy) < max(1, workers):
+                    i, item = queue.popleft()
+                    worker = self.idle.pop() if self.idle else _Worker()
+                    try:
+                        worker.conn.send(item)
+                    except (OSError, ValueError) as e:
+                        worker.kill()
+                        results[i] = (None, f"{type(e).__name__}: {e}")
+                        continue
+                    busy[worker.conn] = (worker, i, time.monotonic() + timeout)
+
+                if not busy:
+                    continue
+                next_deadline = min(deadline for _, _, deadline in busy.values())
+                for conn in wait(list(busy), max(0.0, next_deadline - time.monotonic())):
+                    worker, i, _ = busy.pop(conn)
+                    try:
+                        results[i] = conn.recv()
+                        self.idle.append(worker)
+                    except (EOFError, OSError):
+                        worker.kill()
+                        results[i] = (None, "Extraction worker exited unexpectedly")
+
+                now = time.monotonic()
+                for conn, (worker, i, deadline) in list(busy.items()):
+                    if deadline <= now:
+                        del busy[conn]
+                        worker.kill()
+                        results[i] = (None, f"Timed out after {timeout}s")
+        return results
+
+
+_pool = ExtractPool()
+
+
+def extract_texts(items, workers=EXTRACT_WORKERS, timeout=EXTRACT_TIMEOUT):
+    # items: list of (filename, bytes). Returns [(text, error)] in input order;
+    # text is None when that file failed or exceeded the timeout. Every file,
+    # even a single one, is extracted out of process so a hung PDF cannot
+    # freeze the caller.
+    items = list(items)
+    if not items:
+        return []
+    return _pool.run(items, workers, timeout)
+
+
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "180"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "40"))
+
+SECTION_HEADER_RE = re.compile(
+    r"^\s*(?:summary|profile|objective|career objective|about me|experience|"
+    r"work experience|professional experience|employment history|work history|"
+    r"education|skills|technical skills|core competencies|projects|"
+    r"certifications|publications|awards|achievements|volunteering|"
+    r"languages|interests|references)\s*:?\s*$",
+    re.IGNORECASE
+)
+
+
+def split_sections(text):
+    sections, current = [], []
+    for line in text.splitlines():
+        if SECTION_HEADER_RE.match(line) and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [s for s in sections if s.strip()]
+
+
+def chunk_text(text, max_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    # Section-aligned chunks of at most max_words words (sized to stay under
+    # MiniLM's 256-token window). Short neighbouring sections are packed
+    # together; long ones are cut into windows overlapping by `overlap` words.
+    step = max(1, max_words - overlap)
+    chunks, packed = [], []
+    for section in split_sections(text):
+        words = section.split()
+        if len(packed) + len(words) <= max_words:
+            packed += words
+            continue
+        if packed:
+            chunks.append(" ".join(packed))
+            packed = []
+        if len(words) <= max_words:
+            packed = words
+            continue
+        for start in range(0, len(words), step):
+            chunks.append(" ".join(words[start:start + max_words]))
+            if start + max_words >= len(words):
+                break
+    if packed:
+        chunks.append(" ".join(packed))
+    return chunks